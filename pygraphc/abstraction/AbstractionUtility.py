@@ -1,4 +1,5 @@
 import json
+from pygraphc.preprocess.LogReader import LogReader
 
 
 class AbstractionUtility(object):
@@ -17,36 +18,31 @@ class AbstractionUtility(object):
 
     @staticmethod
     def write_perabstraction(final_abstraction, log_file, perabstraction_file):
-        # read log file
-        with open(log_file, 'r') as f:
-            logs = f.readlines()
-
-        # write logs per abstraction to file
-        f_perabstraction = open(perabstraction_file, 'w')
-        for abstraction_id, abstraction in final_abstraction.iteritems():
-            f_perabstraction.write('Abstraction #' + str(abstraction_id) + ' ' + abstraction['abstraction'] + '\n')
-            for line_id in abstraction['original_id']:
-                f_perabstraction.write(str(line_id) + ' ' + logs[line_id])
-            f_perabstraction.write('\n')
-        f_perabstraction.close()
+        # read log file and write logs per abstraction to file
+        with LogReader(log_file) as logs:
+            f_perabstraction = open(perabstraction_file, 'w')
+            for abstraction_id, abstraction in final_abstraction.iteritems():
+                f_perabstraction.write('Abstraction #' + str(abstraction_id) + ' ' + abstraction['abstraction'] +
+                                       '\n')
+                for line_id in abstraction['original_id']:
+                    f_perabstraction.write(str(line_id) + ' ' + logs[line_id])
+                f_perabstraction.write('\n')
+            f_perabstraction.close()
 
     @staticmethod
     def write_perline(final_abstraction, log_file, perline_file):
-        # read log file
-        with open(log_file, 'r') as f:
-            logs = f.readlines()
-
         # get line id and abstraction id
         abstraction_label = {}
         for abstraction_id, abstraction in final_abstraction.iteritems():
             for line_id in abstraction['original_id']:
                 abstraction_label[line_id] = abstraction_id
 
-        # write log per line with abstraction id
-        f_perline = open(perline_file, 'w')
-        for line_id, log in enumerate(logs):
-            f_perline.write(str(abstraction_label[line_id]) + '; ' + log)
-        f_perline.close()
+        # read log file and write log per line with abstraction id
+        with LogReader(log_file) as logs:
+            f_perline = open(perline_file, 'w')
+            for line_id, log in enumerate(logs):
+                f_perline.write(str(abstraction_label[line_id]) + '; ' + log)
+            f_perline.close()
 
     @staticmethod
     def get_abstractionid_from_groundtruth(logid_abstractionid_file, abstractions):
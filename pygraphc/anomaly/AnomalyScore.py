@@ -5,7 +5,7 @@ from pygraphc.clustering.ClusterUtility import ClusterUtility
 class AnomalyScore(object):
     """A class to calculate anomaly score in a cluster.
     """
-    def __init__(self, graph, clusters, year, edges_dict, sentiment_score, logtype):
+    def __init__(self, graph, clusters, year, edges_dict, sentiment_score, logtype, timestamps=None):
         """The constructor of class AnomalyScore.
 
         Parameters
@@ -22,6 +22,8 @@ class AnomalyScore(object):
             Dictionary of sentiment score per cluster.
         logtype         : str
             Type of event log, i.e., auth, kippo.
+        timestamps      : array.array
+            Epoch of every log line indexed by line id, i.e., `PreprocessLog.timestamps`.
         """
         self.graph = graph
         self.clusters = clusters
@@ -29,6 +31,7 @@ class AnomalyScore(object):
         self.edges_dict = edges_dict
         self.sentiment_score = sentiment_score
         self.logtype = logtype
+        self.timestamps = timestamps
 
         self.anomaly_score = {}
         self.quadratic_score = {}
@@ -38,7 +41,7 @@ class AnomalyScore(object):
         # get cluster abstraction and its properties
         self.abstraction = ClusterAbstraction.dp_lcs(self.graph, self.clusters)
         self.property = ClusterUtility.get_cluster_property(self.graph, self.clusters, self.year,
-                                                            self.edges_dict, self.logtype)
+                                                            self.edges_dict, self.logtype, self.timestamps)
 
     def get_anomaly_score(self):
         """Get anomaly score per cluster.
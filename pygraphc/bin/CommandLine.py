@@ -144,7 +144,7 @@ def run():
     year = options.y
 
     # preprocess log file
-    p = PreprocessLog(analyzed_file)
+    p = PreprocessLog('auth', analyzed_file, year=year)
     p.do_preprocess()
     events_unique = p.events_unique
     logs = p.logs
@@ -241,11 +241,11 @@ def main(dataset, year, method, log_type, evaluation, illustration):
 
         if method in graph_method:
             # preprocess log file
-            preprocess = PreprocessLog(log_type, properties['log_path'])
+            preprocess = PreprocessLog(log_type, properties['log_path'], year=year)
             if log_type == 'auth':
                 preprocess.do_preprocess()  # auth
-            elif log_type == 'kippo' or log_type == 'syslog' or log_type == 'bluegene-logs' or log_type == 'raslog' \
-                    or log_type == 'vpnlog':
+            elif log_type == 'kippo' or log_type == 'syslog' or log_type == 'bluegene' or log_type == 'bluegene-logs' \
+                    or log_type == 'raslog' or log_type == 'vpnlog':
                 preprocess.preprocess()
             events_unique = preprocess.events_unique
             original_logs = preprocess.logs
@@ -412,7 +412,7 @@ def main(dataset, year, method, log_type, evaluation, illustration):
 if __name__ == '__main__':
     # available datasets: Hofstede2014, SecRepo, forensic-challenge-2010, hnet-hon-2004, hnet-hon-2006, Kippo,
     #                     forensic-challenge-2010-syslog, bluegene, ras
-    # available log type: auth, kippo, syslog, bluegene-logs, raslog
+    # available log type: auth, kippo, syslog, bluegene (or bluegene-logs), raslog
     # available methods : majorclust, improved_majorclust, graph_entropy, max_clique_weighted, IPLoM, LKE
     #                     improved_majorclust_wo_refine, max_clique_weighted_sa
     start = time()
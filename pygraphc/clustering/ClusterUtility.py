@@ -1,6 +1,6 @@
 from itertools import combinations
-from datetime import datetime
 import networkx as nx
+from pygraphc.preprocess.TimestampParser import TimestampParser
 
 
 class ClusterUtility(object):
@@ -83,9 +83,13 @@ class ClusterUtility(object):
                 graph.node[node]['cluster'] = cluster_id
 
     @staticmethod
-    def get_cluster_property(graph, clusters, year, edges_dict, logtype):
+    def get_cluster_property(graph, clusters, year, edges_dict, logtype, timestamps=None):
         """Get cluster property.
 
+        The inter-arrival time is the difference between the earliest and the latest epoch of the member log lines.
+        The epochs are taken from `timestamps` if it is given, otherwise from `start_epoch` and `end_epoch` of the
+        nodes set by `PreprocessLog`. For nodes without them, `start` and `end` strings are parsed in `year`.
+
         Parameters
         ----------
         graph           : graph
@@ -98,6 +102,9 @@ class ClusterUtility(object):
             Dictionary of edges. Keys: (node1, node2), values: index.
         logtype         : str
             Type of event log, e.g., auth or kippo
+        timestamps      : array.array
+            Epoch of every log line indexed by line id, i.e., `PreprocessLog.timestamps`. The `member` of a node
+            must be a list of line ids.
 
         Returns
         -------
@@ -115,33 +122,21 @@ class ClusterUtility(object):
         """
         cluster_property = {}      # event log frequency per cluster
         num_edges = ClusterUtility.get_num_edges(clusters, edges_dict)
+
+        # timestamp strings are parsed in the given year
+        timestamp_parser = TimestampParser(logtype, year, fixed_year=True) if year else None
         for cluster_id, nodes in clusters.iteritems():
             properties = {}
-            datetimes = []
+            epochs = []
             for node_id in nodes:
                 properties['frequency'] = properties.get('frequency', 0) + graph.node[node_id]['frequency']
                 properties['member'] = properties.get('member', 0) + 1
-                datetimes.append(graph.node[node_id]['start'])
-                datetimes.append(graph.node[node_id]['end'])
+                epochs.extend(ClusterUtility.__get_node_epochs(graph.node[node_id], timestamps, timestamp_parser))
 
             # get inter-arrival rate
-            sorted_datetimes = sorted(datetimes)
-            start, end = None, None
-            if logtype == 'auth':
-                start_temp = sorted_datetimes[0].split()
-                end_temp = sorted_datetimes[-1].split()  # note that it is -1 not 1
-                start = datetime.strptime(' '.join(start_temp[:2]) + ' ' + year + ' ' + ' '.join(start_temp[2:]),
-                                          '%b %d %Y %H:%M:%S')
-                end = datetime.strptime(' '.join(end_temp[:2]) + ' ' + year + ' ' + ' '.join(end_temp[2:]),
-                                        '%b %d %Y %H:%M:%S')
-            elif logtype == 'kippo':
-                start_temp = sorted_datetimes[0]
-                end_temp = sorted_datetimes[-1]
-                start = datetime.strptime(start_temp, '%Y-%m-%d %H:%M:%S')
-                end = datetime.strptime(end_temp, '%Y-%m-%d %H:%M:%S')
-
-            interarrival_times = end - start
-            interarrival = interarrival_times.seconds if interarrival_times.seconds != 0 else 1
+            epochs = [epoch for epoch in epochs if epoch >= 0]
+            interarrival = max(epochs) - min(epochs) if epochs else 0
+            interarrival = interarrival if interarrival != 0 else 1
             properties['interarrival_time'] = interarrival
             properties['interarrival_rate'] = float(interarrival) / float(properties['frequency'])
             properties['edges_number'] = num_edges[cluster_id]
@@ -152,6 +147,35 @@ class ClusterUtility(object):
 
         return cluster_property
 
+    @staticmethod
+    def __get_node_epochs(node, timestamps, timestamp_parser):
+        """Get epochs of a node.
+
+        Parameters
+        ----------
+        node                : dict
+            Attributes of a node.
+        timestamps          : array.array
+            Epoch of every log line indexed by line id or None.
+        timestamp_parser    : TimestampParser
+            Parser for the timestamp strings of the node.
+
+        Returns
+        -------
+        epochs              : list[int]
+            Epochs of the node. -1 is an unparsed timestamp.
+        """
+        if timestamps is not None:
+            epochs = [timestamps[log_id] for log_id in node['member']]
+        elif 'start_epoch' in node:
+            epochs = [node['start_epoch'], node['end_epoch']]
+        elif timestamp_parser:
+            epochs = [timestamp_parser.get_epoch(node['start']), timestamp_parser.get_epoch(node['end'])]
+        else:
+            epochs = []
+
+        return epochs
+
     @staticmethod
     def get_num_edges(clusters, edges_dict):
         """Find number of edges in the cluster.
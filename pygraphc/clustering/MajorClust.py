@@ -237,6 +237,7 @@ class ImprovedMajorClust(MajorClust):
             member = []
             total_frequency, total_nodes = 0, 0
             timestamps = []
+            epochs = []
             for node in self.graph.nodes_iter(data=True):
                 if node[1]['cluster'] == uc:
                     events.append(node[1]['event'])    # to be tested: not 'event' but 'preprocessed_event'
@@ -244,6 +245,8 @@ class ImprovedMajorClust(MajorClust):
                     total_nodes += 1
                     timestamps.append(node[1]['start'])
                     timestamps.append(node[1]['end'])
+                    if 'start_epoch' in node[1]:
+                        epochs.extend([node[1]['start_epoch'], node[1]['end_epoch']])
                     member.append(node[0])
 
             # get start and end time for a specific cluster
@@ -254,6 +257,9 @@ class ImprovedMajorClust(MajorClust):
             refined_nodes.append([uc, {'event': event_lcs.strip(), 'tf-idf': 0, 'length': 0, 'cluster': uc,
                                        'frequency': total_frequency, 'total_nodes': total_nodes, 'status': '',
                                        'start': sorted_timestamps[0], 'end': sorted_timestamps[-1], 'member': member}])
+            epochs = [epoch for epoch in epochs if epoch >= 0]
+            if epochs:
+                refined_nodes[-1][1]['start_epoch'], refined_nodes[-1][1]['end_epoch'] = min(epochs), max(epochs)
             all_events.append(event_lcs)
 
         # set tf-idf and document length for refined_nodes
@@ -1,18 +1,25 @@
 from __future__ import division
 from orderedset import OrderedSet
 from pygraphc.similarity.CosineSimilarity import CosineSimilarity
+from pygraphc.evaluation.EvaluationUtility import EvaluationUtility
 
 
 class CalinskiHarabaszIndex(object):
     def __init__(self, clusters, preprocessed_logs, log_length):
         self.clusters = clusters
-        self.preprocessed_logs = preprocessed_logs
+        self.preprocessed_logs, self.token_ids = EvaluationUtility.get_hashable_logs(preprocessed_logs)
         self.log_length = log_length
         self.cluster_centroids = {}
         self.cluster_total_nodes = {}
         self.distance_buffer = {}
 
     def __get_centroid(self, cluster=None):
+        # centroid of token ids for a particular cluster or for the whole logs
+        if self.token_ids:
+            log_ids = cluster if cluster else self.preprocessed_logs
+            centroid = OrderedSet(token_id for log_id in log_ids for token_id in self.preprocessed_logs[log_id])
+            return tuple(centroid)
+
         centroid = ''
 
         # centroid for a particular cluster
@@ -11,3 +11,13 @@ class EvaluationUtility(object):
                     new_clusters.setdefault(cluster_id, []).append(member)
 
         return new_clusters
+
+    @staticmethod
+    def get_hashable_logs(preprocessed_logs):
+        # preprocessed logs as token id arrays, e.g., `preprocessed_logs_ids`, are converted to tuples,
+        # so they can be keys in the distance buffer. preprocessed logs as strings are not changed.
+        token_ids = not isinstance(next(preprocessed_logs.itervalues(), ''), basestring)
+        if token_ids:
+            preprocessed_logs = dict((log_id, tuple(ids)) for log_id, ids in preprocessed_logs.iteritems())
+
+        return preprocessed_logs, token_ids
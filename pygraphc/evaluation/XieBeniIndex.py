@@ -1,12 +1,13 @@
 from __future__ import division
 from pygraphc.similarity.CosineSimilarity import CosineSimilarity
+from pygraphc.evaluation.EvaluationUtility import EvaluationUtility
 from itertools import product
 
 
 class XieBeniIndex(object):
     def __init__(self, clusters, preprocessed_logs, log_length):
         self.clusters = clusters
-        self.preprocessed_logs = preprocessed_logs
+        self.preprocessed_logs, self.token_ids = EvaluationUtility.get_hashable_logs(preprocessed_logs)
         self.log_length = log_length
         self.cluster_centroids = {}
         self.cluster_total_nodes = {}
@@ -15,6 +16,10 @@ class XieBeniIndex(object):
 
     def __get_centroid(self, cluster):
         # centroid for a particular cluster
+        if self.token_ids:
+            centroid = tuple(token_id for log_id in cluster for token_id in self.preprocessed_logs[log_id])
+            return centroid
+
         centroid = ''
         for log_id in cluster:
             centroid = centroid + ' ' + self.preprocessed_logs[log_id]
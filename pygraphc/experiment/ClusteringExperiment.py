@@ -114,6 +114,14 @@ class ClusteringExperiment(object):
 
         return tuple(internal_evaluation)
 
+    def __get_preprocessed_logs(self, log_file):
+        # preprocess logs for evaluation. the result is cached if [preprocess_cache] is set in the config file.
+        cache = self.configuration.get('preprocess_cache', {})
+        cache_size = int(cache.get('cache_size', 1024)) * 1024 * 1024
+        pp = ParallelPreprocess(log_file, False, cache_dir=cache.get('cache_dir'), cache_size=cache_size)
+        pp.get_unique_events()
+        return pp
+
     @staticmethod
     def __check_path(path):
         # check a path is exist or not. if not exist, then create it
@@ -256,8 +264,7 @@ class ClusteringExperiment(object):
                     evaluation_results = []
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(log_file, False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(log_file)
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
@@ -286,16 +293,14 @@ class ClusteringExperiment(object):
                     clusters = myiplom.get_clusters()
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(properties['log_path'], False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(properties['log_path'])
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
 
                 elif self.method == 'LogSig':
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(properties['log_path'], False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(properties['log_path'])
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
@@ -338,8 +343,7 @@ class ClusteringExperiment(object):
                     clusters = lke.get_clusters()
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(properties['log_path'], False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(properties['log_path'])
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
@@ -507,8 +511,7 @@ class ClusteringExperiment(object):
                     evaluation_results = []
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(log_file, False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(log_file)
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
@@ -537,8 +540,7 @@ class ClusteringExperiment(object):
                     clusters = myiplom.get_clusters()
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(properties['log_path'], False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(properties['log_path'])
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
@@ -557,8 +559,7 @@ class ClusteringExperiment(object):
                     clusters = ls.get_clusters()
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(properties['log_path'], False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(properties['log_path'])
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
@@ -576,8 +577,7 @@ class ClusteringExperiment(object):
                     clusters = lke.get_clusters()
 
                     # preprocess logs for evaluation
-                    pp = ParallelPreprocess(properties['log_path'], False)
-                    pp.get_unique_events()
+                    pp = self.__get_preprocessed_logs(properties['log_path'])
                     preprocessed_logs = pp.preprocessed_logs
                     log_length = pp.log_length
                     original_logs = pp.logs
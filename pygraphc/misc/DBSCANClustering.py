@@ -3,6 +3,7 @@ from sklearn.cluster import DBSCAN
 from numpy import linspace
 from itertools import product
 from operator import itemgetter
+from pygraphc.preprocess.LogReader import LogReader
 from pygraphc.preprocess.ParallelPreprocess import ParallelPreprocess
 from pygraphc.evaluation.CalinskiHarabaszIndex import CalinskiHarabaszIndex
 
@@ -16,9 +17,9 @@ class DBSCANClustering(object):
         self.log_length = 0
 
     def __open_file(self):
-        # read a log file
-        with open(self.log_file, 'r') as f:
-            self.logs = f.readlines()
+        # read a log file. the vectorizer needs all lines in every run, so they are kept as a list.
+        with LogReader(self.log_file) as logs:
+            self.logs = logs[:]
         self.log_length = len(self.logs)
 
     def __preprocess_logs(self):
@@ -19,7 +19,7 @@ class OutputText(object):
         max_cluster_id          : int
             Maximum value of cluster identifier.
         original_logs           : iterable
-            List of original event logs.
+            List of original event logs or a memory-mapped LogReader.
         """
         fopen = open(perline_file, 'w')
         for rowid, cluster_id in perline_analysis.iteritems():
@@ -42,7 +42,7 @@ class OutputText(object):
         graph                   : graph
             The graph which its clustering result to be written to a file.
         original_logs           : iterable
-            List of original event logs.
+            List of original event logs or a memory-mapped LogReader.
         """
         f = open(percluster_file, 'w')
         for cluster_id, nodes in clusters.iteritems():
@@ -133,7 +133,7 @@ class OutputText(object):
         anomaly_perline_file    : str
             Filename for result of anomaly label per line.
         original_logs           : iterable
-            List of original event logs.
+            List of original event logs or a memory-mapped LogReader.
         """
         decision_perlog = {}
         for cluster_id, decision in anomaly_decision.iteritems():
@@ -1,12 +1,22 @@
-from itertools import combinations
+from itertools import izip
 import networkx as nx
-from pygraphc.similarity.StringSimilarity import StringSimilarity
+import numpy as np
+from scipy.sparse import csr_matrix
+from pygraphc.similarity.KNearestNeighbors import KNearestNeighbors
 
 
 class CreateGraph(object):
     """A class for generating graph from preprocessed logs.
+
+    The tf-idf of unique events is assembled into a sparse matrix where each row is divided by the document length,
+    so the cosine similarity of all pairs is the product of the matrix and its transpose. The product is
+    calculated for `block_size` rows at a time to bound the memory, and only the similarities above
+    `cosine_threshold` are kept as edges. If `k` is given, only the edges to the `k` most similar neighbours of
+    every node are kept, so the graph has O(nk) edges for the clustering methods.
     """
-    def __init__(self, events_unique, cosine_threshold=0):
+    block_size = 1024
+
+    def __init__(self, events_unique, cosine_threshold=0, partition=None, k=None, mutual=False):
         """Constructor for class CreateGraph.
 
         Parameters
@@ -15,12 +25,22 @@ class CreateGraph(object):
             List of unique events from preprocessed logs.
         cosine_threshold    : float
             Threshold of cosine similarity measure for edge weight.
+        partition           : EventPartition
+            If it is given, edges are only created between unique events in the same partition, e.g.,
+            `EventPartition.from_columns(events_unique, preprocess.columns)` for the service of the events.
+        k                   : int
+            Number of nearest neighbours of a node to keep edges to. All edges are kept if it is not given.
+        mutual              : bool
+            Keep an edge only if both nodes are in the k nearest neighbours of each other.
         """
         self.events_unique = events_unique
         self.g = nx.MultiGraph()
         self.edges_dict = {}
         self.edges_weight = []
         self.cosine_threshold = cosine_threshold
+        self.partition = partition
+        self.k = k
+        self.mutual = mutual
 
     def do_create(self):
         """Main method to be executed to create a graph.
@@ -45,20 +65,126 @@ class CreateGraph(object):
         """
         self.g.add_nodes_from(self.events_unique)
 
+    def __get_tfidf_matrix(self):
+        """Assemble the tf-idf of unique events into a row-normalized sparse matrix.
+
+        If the unique events have `tfidf_ids` and `tfidf_weights`, e.g., from `PreprocessLog` with token_ids, the
+        token ids are the column indices, so the words are not looked up again.
+
+        Returns
+        -------
+        matrix  : scipy.sparse.csr_matrix
+            A row for every unique event in the order of `events_unique` and a column for every word. The tf-idf
+            is divided by the document length, so the dot product of two rows is their cosine similarity.
+        """
+        columns = {}    # key: word, value: column index
+        indptr, indices, data = [0], [], []
+        token_ids = all('tfidf_ids' in attributes for index, attributes in self.events_unique)
+        for index, attributes in self.events_unique:
+            length = attributes['length']
+            if length and token_ids:
+                indices.extend(attributes['tfidf_ids'])
+                data.extend(tfidf / length for tfidf in attributes['tfidf_weights'])
+            elif length:
+                for word, tfidf in attributes['tf-idf']:
+                    indices.append(columns.setdefault(word, len(columns)))
+                    data.append(tfidf / length)
+            indptr.append(len(indices))
+
+        total_columns = max(indices) + 1 if indices else 1
+        matrix = csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32),
+                             np.array(indptr, dtype=np.int32)), shape=(len(self.events_unique), total_columns))
+        return matrix
+
+    def __get_similarity(self, value):
+        # round the cosine similarity like StringSimilarity and keep it if it is bigger than the threshold
+        cosine_similarity = round(float(value), 3)
+        return cosine_similarity if cosine_similarity > self.cosine_threshold else None
+
+    def __get_block_similarities(self, matrix, positions):
+        """Calculate cosine similarity of all pairs of rows with blocked sparse products.
+
+        Parameters
+        ----------
+        matrix          : scipy.sparse.csr_matrix
+            The row-normalized tf-idf matrix.
+        positions       : numpy.ndarray
+            Sorted row positions to be compared with each other.
+
+        Returns
+        -------
+        similarities    : generator
+            Tuples of (row position, row position, cosine similarity) above the threshold for the pairs of rows in
+            ascending order. They are generated block by block.
+        """
+        submatrix = matrix[positions]
+        transposed = submatrix.T.tocsr()
+        for start in xrange(0, len(positions), self.block_size):
+            block = (submatrix[start:start + self.block_size] * transposed).tocoo()
+            rows = block.row + start
+
+            # the upper triangle holds every pair once. a value below the threshold by more than the rounding is
+            # removed before rounding in Python.
+            candidates = (block.col > rows) & (block.data > self.cosine_threshold - 0.0005)
+            rows, cols, values = rows[candidates], block.col[candidates], block.data[candidates]
+            order = np.lexsort((cols, rows))
+            for row, col, value in izip(positions[rows[order]], positions[cols[order]], values[order]):
+                cosine_similarity = self.__get_similarity(value)
+                if cosine_similarity is not None:
+                    yield int(row), int(col), cosine_similarity
+
+    def __get_partition_similarities(self, matrix, nodes):
+        """Calculate cosine similarity of pairs in the same partition and of the cross-partition sample.
+
+        Parameters
+        ----------
+        matrix          : scipy.sparse.csr_matrix
+            The row-normalized tf-idf matrix.
+        nodes           : list[int]
+            Unique event ids in the order of the rows.
+
+        Returns
+        -------
+        similarities    : list[tuple]
+            List of (row position, row position, cosine similarity) above the threshold in ascending order.
+        """
+        node_positions = dict((node, position) for position, node in enumerate(nodes))
+        similarities = []
+        for members in self.partition.get_groups(nodes).itervalues():
+            positions = np.array(sorted(node_positions[node] for node in members), dtype=np.intp)
+            similarities.extend(self.__get_block_similarities(matrix, positions))
+
+        for source, destinations in self.partition.get_cross_pairs(sorted(nodes)).iteritems():
+            for destination in destinations:
+                position1, position2 = sorted((node_positions[source], node_positions[destination]))
+                cosine_similarity = self.__get_similarity(matrix[position1].multiply(matrix[position2]).sum())
+                if cosine_similarity is not None:
+                    similarities.append((position1, position2, cosine_similarity))
+
+        similarities.sort()
+        return similarities
+
     def __create_edges(self):
         """Create all edges in the graph based on cosine similarity measure.
         """
-        edges_combinations = [eu[0] for eu in self.events_unique]
+        nodes = [eu[0] for eu in self.events_unique]
+        matrix = self.__get_tfidf_matrix()
+        if self.partition:
+            similarities = self.__get_partition_similarities(matrix, nodes)
+        else:
+            similarities = self.__get_block_similarities(matrix, np.arange(len(nodes)))
+
+        # keep only the edges to the nearest neighbours with a bounded heap per node
+        if self.k:
+            knn = KNearestNeighbors(self.k, self.mutual)
+            knn.add_edges(similarities)
+            similarities = knn.get_edges()
+
+        # create edge if cosine similarity measure is bigger then threshold
         edge_index = 0
-        for ec in combinations(edges_combinations, 2):
-            # get cosine similarity between two nodes
-            tfidf1, tfidf2 = self.g.node[ec[0]]['tf-idf'], self.g.node[ec[1]]['tf-idf']
-            length1, length2 = self.g.node[ec[0]]['length'], self.g.node[ec[1]]['length']
-            cosine_similarity = StringSimilarity.get_cosine_similarity(tfidf1, tfidf2, length1, length2)
-
-            # create edge if cosine similarity measure is bigger then threshold
-            if cosine_similarity > self.cosine_threshold:
-                self.g.add_edge(ec[0], ec[1], weight=cosine_similarity)
-                self.edges_weight.append((ec[0], ec[1], cosine_similarity))
-                self.edges_dict[(ec[0], ec[1])] = edge_index
-                edge_index += 1
+        for position1, position2, cosine_similarity in similarities:
+            node1, node2 = nodes[position1], nodes[position2]
+            self.g.add_edge(node1, node2, weight=cosine_similarity)
+            self.edges_weight.append((node1, node2, cosine_similarity))
+            self.edges_dict[(node1, node2)] = edge_index
+            edge_index += 1
@@ -1,3 +1,4 @@
+from pygraphc.preprocess.EventPartition import EventPartition
 from pygraphc.preprocess.ParallelPreprocess import ParallelPreprocess
 from pygraphc.similarity.CosineSimilarity import ParallelCosineSimilarity
 from pygraphc.pruning.TrianglePruning import TrianglePruning
@@ -5,13 +6,21 @@ import networkx as nx
 
 
 class CreateGraphModel(object):
-    def __init__(self, log_file='', count_groups=None, pruning=False):
+    def __init__(self, log_file='', count_groups=None, pruning=False, partition_field=None, logtype='auth',
+                 cross_sample=0, lsh=None, k=None, mutual=False, token_ids=False, exact_df=False):
+        # partition_field, e.g., service, enables edges only between unique events with the same value of the field.
+        # lsh, a MinHashLSH, enables approximate edges between candidate pairs only.
+        # k keeps only the edges to the k most similar neighbours of every node, or mutual ones if mutual is set.
+        # token_ids compares events as token id arrays and keeps `preprocessed_logs_ids` for the evaluation indices.
+        # exact_df counts the document frequency of every pair and skips pairs without a common word.
         self.log_file = log_file
         self.log_length = 0
         self.unique_events = []
         self.unique_events_length = 0
         self.event_attributes = {}
         self.preprocessed_logs = {}
+        self.preprocessed_logs_ids = {}
+        self.vocabulary = None
         self.preprocessed_logs_groundtruth = {}
         self.distances = []
         self.graph = nx.MultiGraph()
@@ -25,21 +34,39 @@ class CreateGraphModel(object):
         self.subgraph = nx.MultiGraph()
         self.subgraph_noattributes = nx.Graph()
         self.pp = None
+        self.partition_field = partition_field
+        self.logtype = logtype
+        self.cross_sample = cross_sample
+        self.partition = None
+        self.lsh = lsh
+        self.k = k
+        self.mutual = mutual
+        self.token_ids = token_ids
+        self.exact_df = exact_df
 
     def __get_nodes(self):
         # preprocess logs and get unique events as nodes in a graph
-        self.pp = ParallelPreprocess(self.log_file)
+        self.pp = ParallelPreprocess(self.log_file, token_ids=self.token_ids)
         self.unique_events = self.pp.get_unique_events()
         self.unique_events_length = self.pp.unique_events_length
         self.event_attributes = self.pp.event_attributes
         self.preprocessed_logs = self.pp.preprocessed_logs
+        self.preprocessed_logs_ids = self.pp.preprocessed_logs_ids
+        self.vocabulary = self.pp.vocabulary
         self.log_length = self.pp.log_length
         self.logs = self.pp.logs
         self.preprocessed_logs_groundtruth = self.pp.preprocessed_logs_groundtruth
 
+        # partition unique events by a parsed field of their first line
+        if self.partition_field:
+            self.partition = EventPartition.from_logs(self.event_attributes, self.logs, self.logtype,
+                                                      self.partition_field, self.cross_sample)
+
     def __get_distances(self):
         # get cosine distance as edges with weight
-        pcs = ParallelCosineSimilarity(self.event_attributes, self.unique_events_length)
+        pcs = ParallelCosineSimilarity(self.event_attributes, self.unique_events_length, token_ids=self.token_ids,
+                                       partition=self.partition, lsh=self.lsh, k=self.k, mutual=self.mutual,
+                                       exact_df=self.exact_df)
         self.distances = pcs.get_parallel_cosine_similarity()
 
     def create_graph(self):
@@ -132,7 +159,9 @@ class CreateGraphModel(object):
                                                         self.graph)
 
     def __get_distances_subgraph(self, nodes):
-        pcs = ParallelCosineSimilarity(self.event_attributes_subgraph, self.unique_events_length_subgraph, nodes)
+        pcs = ParallelCosineSimilarity(self.event_attributes_subgraph, self.unique_events_length_subgraph, nodes,
+                                       self.token_ids, partition=self.partition, lsh=self.lsh, k=self.k,
+                                       mutual=self.mutual, exact_df=self.exact_df)
         self.distances_subgraph = pcs.get_parallel_cosine_similarity()
 
     def create_graph_subgraph(self, nodes):
@@ -0,0 +1,198 @@
+from collections import defaultdict
+from random import Random
+from pygraphc.preprocess.LogGrammar import LogGrammar
+
+
+class EventPartition(object):
+    """Partition of unique events by a parsed field to compare only events in the same partition.
+
+    Events of different services, e.g., sshd, sudo, and CRON in auth logs, are rarely in the same cluster, so
+    similarity edges are only calculated between events with the same value of a field. For partitions of `n_i`
+    events, the number of compared pairs is about `sum(n_i * (n_i - 1) / 2)` instead of `n * (n - 1) / 2`.
+    Optionally, every event is also compared with `cross_sample` random events of other partitions, so a few edges
+    between partitions can still be found. The sample is drawn with a fixed seed, and the pairs are generated
+    in the same order as `itertools.combinations`, i.e., ascending `(source, destination)`.
+    """
+    def __init__(self, partitions, cross_sample=0, seed=0):
+        """The constructor of class EventPartition.
+
+        Parameters
+        ----------
+        partitions      : dict
+            Partition key of every unique event. key: unique event id, value: partition key, e.g., a service.
+        cross_sample    : int
+            Number of random events of other partitions compared with every event.
+        seed            : int
+            Seed of the random cross-partition sample.
+        """
+        self.partitions = partitions
+        self.cross_sample = cross_sample
+        self.seed = seed
+
+    @classmethod
+    def from_logs(cls, event_attributes, logs, logtype, field='service', cross_sample=0, seed=0):
+        """Partition unique events by a field of the first member line parsed with `LogGrammar`.
+
+        Parameters
+        ----------
+        event_attributes    : dict
+            Attributes of unique events with `member` line ids, e.g., from `ParallelPreprocess`.
+        logs                : list[str]
+            Log lines indexed by line id, e.g., `ParallelPreprocess.logs`.
+        logtype             : str
+            Type of event log.
+        field               : str
+            Name of the parsed field.
+        cross_sample        : int
+            Number of random events of other partitions compared with every event.
+        seed                : int
+            Seed of the random cross-partition sample.
+
+        Returns
+        -------
+        partition           : EventPartition
+            Partition of the unique events. An event without the field is in the partition None.
+        """
+        parser = LogGrammar(logtype).get_parser()
+        partitions = {}
+        for index, attributes in event_attributes.iteritems():
+            parsed = parser(logs[attributes['member'][0]])
+            partitions[index] = parsed.get(field)
+
+        return cls(partitions, cross_sample, seed)
+
+    @classmethod
+    def from_columns(cls, events_unique, columns, field='service', cross_sample=0, seed=0):
+        """Partition unique events by a column of the first member line without parsing the logs again.
+
+        Parameters
+        ----------
+        events_unique   : list[tuple]
+            List of (unique event id, attributes) with `member` line ids, e.g., `PreprocessLog.events_unique`.
+        columns         : LogColumns
+            Header fields of the log lines, e.g., `PreprocessLog.columns`.
+        field           : str
+            Name of the field.
+        cross_sample    : int
+            Number of random events of other partitions compared with every event.
+        seed            : int
+            Seed of the random cross-partition sample.
+
+        Returns
+        -------
+        partition       : EventPartition
+            Partition of the unique events. An event without the field is in the partition -1.
+        """
+        column = columns.get_column(field) if field in columns else None
+        partitions = {}
+        for index, attributes in events_unique:
+            partitions[index] = int(column[attributes['member'][0]]) if column is not None else -1
+
+        return cls(partitions, cross_sample, seed)
+
+    def get_groups(self, nodes):
+        """Group nodes by partition key.
+
+        Parameters
+        ----------
+        nodes   : list[int]
+            Unique event ids.
+
+        Returns
+        -------
+        groups  : dict
+            key: partition key, value: sorted unique event ids in the partition.
+        """
+        groups = defaultdict(list)
+        for node in sorted(nodes):
+            groups[self.partitions.get(node)].append(node)
+
+        return dict(groups)
+
+    def get_cross_pairs(self, nodes, groups=None):
+        """Sample pairs of unique events in different partitions.
+
+        Parameters
+        ----------
+        nodes       : list[int]
+            Sorted unique event ids.
+        groups      : dict
+            Groups of the nodes from `get_groups`. They are calculated if not given.
+
+        Returns
+        -------
+        cross_pairs : dict
+            key: the smaller unique event id of a pair, value: set of the larger unique event ids.
+        """
+        if groups is None:
+            groups = self.get_groups(nodes)
+
+        cross_pairs = defaultdict(set)
+        if not self.cross_sample or len(groups) < 2:
+            return cross_pairs
+
+        random = Random(self.seed)
+        for node in nodes:
+            key = self.partitions.get(node)
+            others = len(nodes) - len(groups[key])
+            sample_size = min(self.cross_sample, others)
+            sampled = set()
+            while len(sampled) < sample_size:
+                other = nodes[random.randrange(len(nodes))]
+                if self.partitions.get(other) != key:
+                    sampled.add(other)
+
+            for other in sampled:
+                source, destination = min(node, other), max(node, other)
+                cross_pairs[source].add(destination)
+
+        return cross_pairs
+
+    def get_pairs(self, nodes):
+        """Generate pairs of unique events to be compared.
+
+        Parameters
+        ----------
+        nodes   : list[int]
+            Unique event ids.
+
+        Returns
+        -------
+        pairs   : generator
+            Pairs of unique event ids in ascending order, like `itertools.combinations(sorted(nodes), 2)`.
+        """
+        nodes = sorted(nodes)
+        groups = self.get_groups(nodes)
+        cross_pairs = self.get_cross_pairs(nodes, groups)
+
+        # position of every node in its partition to get the larger nodes of the same partition
+        positions = {}
+        for members in groups.itervalues():
+            for position, node in enumerate(members):
+                positions[node] = position
+
+        for node in nodes:
+            members = groups[self.partitions.get(node)]
+            destinations = members[positions[node] + 1:]
+            if node in cross_pairs:
+                destinations = sorted(cross_pairs[node].union(destinations))
+
+            for destination in destinations:
+                yield node, destination
+
+    def get_total_pairs(self, nodes):
+        """Get the number of pairs from `get_pairs` without the cross-partition sample.
+
+        Parameters
+        ----------
+        nodes   : list[int]
+            Unique event ids.
+
+        Returns
+        -------
+        total_pairs : int
+            Number of pairs in all partitions.
+        """
+        groups = self.get_groups(nodes)
+        total_pairs = sum(len(members) * (len(members) - 1) // 2 for members in groups.itervalues())
+        return total_pairs
@@ -0,0 +1,140 @@
+from collections import MutableMapping
+
+
+class EventRecord(object):
+    """A compact record of a unique event with a dict-like view.
+
+    The known attributes of a unique event are stored in `__slots__` instead of a per-event dictionary, and the
+    member line ids are stored in an `array('I')` by `PreprocessLog` and `ParallelPreprocess`. A record is read and
+    written like the attribute dictionary it replaces, e.g., `record['member'].append(log_id)` or
+    `record['tf-idf']`, and other keys are kept in a small dictionary. A record is unhashable like a dictionary,
+    so networkx copies it as node data in `add_nodes_from`.
+    """
+    __slots__ = ('event', 'tfidf', 'length', 'status', 'cluster', 'frequency', 'member', 'preprocessed_event',
+                 'start', 'end', 'start_epoch', 'end_epoch', 'preprocessed_event_ids', 'tfidf_ids', 'tfidf_weights',
+                 'preprocessed_event_countgroup', 'preprocessed_events_graphedge',
+                 'preprocessed_events_graphedge_ids', 'extra')
+    slot_names = {'tf-idf': 'tfidf'}
+    key_names = {'tfidf': 'tf-idf'}
+    __hash__ = None
+
+    def __init__(self, attributes=None):
+        """The constructor of class EventRecord.
+
+        Parameters
+        ----------
+        attributes  : dict
+            Initial attributes of the unique event.
+        """
+        self.extra = None
+        if attributes:
+            self.update(attributes)
+
+    def __get_slot(self, key):
+        # get the slot name of a key or None for an extra key
+        slot = self.slot_names.get(key, key)
+        return slot if slot in self.__slots__ and slot != 'extra' else None
+
+    def __getitem__(self, key):
+        slot = self.__get_slot(key)
+        try:
+            if slot:
+                return getattr(self, slot)
+            return self.extra[key]
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        slot = self.__get_slot(key)
+        if slot:
+            setattr(self, slot, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        slot = self.__get_slot(key)
+        try:
+            if slot:
+                delattr(self, slot)
+            else:
+                del self.extra[key]
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        slot = self.__get_slot(key)
+        if slot:
+            return hasattr(self, slot)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for slot in self.__slots__:
+            if slot != 'extra' and hasattr(self, slot):
+                yield self.key_names.get(slot, slot)
+        if self.extra:
+            for key in self.extra:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, MutableMapping):
+            return NotImplemented
+        return dict(self.iteritems()) == dict(other.iteritems())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'EventRecord(%r)' % dict(self.iteritems())
+
+    def __getstate__(self):
+        return dict(self.iteritems())
+
+    def __setstate__(self, state):
+        self.extra = None
+        self.update(state)
+
+    def keys(self):
+        return list(self)
+
+    def iterkeys(self):
+        return iter(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def itervalues(self):
+        for key in self:
+            yield self[key]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def iteritems(self):
+        for key in self:
+            yield key, self[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, attributes):
+        for key, value in attributes.iteritems():
+            self[key] = value
+
+    def copy(self):
+        return EventRecord(self)
+
+
+MutableMapping.register(EventRecord)
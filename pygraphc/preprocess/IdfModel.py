@@ -0,0 +1,134 @@
+import cPickle
+import gzip
+from array import array
+from math import log
+
+
+class IdfModel(object):
+    """Inverse document frequency of words fitted once on a reference corpus.
+
+    `PreprocessLog` normally derives the inverse document frequency from the file being processed, so every run
+    counts document frequency again and the weights of two files are not comparable. A fitted model keeps the
+    number of documents and the document frequency of every word, and the idf of a word is
+    `1 + log(total_docs / df)` like in `PreprocessLog.get_tfidf`. A word which is not in the reference corpus gets
+    `default_idf`. By default, it is the idf of a word in a single document, i.e., the highest idf of the model,
+    so an unseen word is treated as a rare word. The model is saved as a gzip-compressed binary pickle of a word
+    list and an array of counts.
+    """
+    version = 1
+
+    def __init__(self, total_docs=0, word_count=None, default_idf=None):
+        """The constructor of class IdfModel.
+
+        Parameters
+        ----------
+        total_docs  : int
+            Number of documents, i.e., log lines, in the reference corpus.
+        word_count  : dict
+            Document frequency of words. key: word, value: number of documents with the word.
+        default_idf : float
+            The idf of an unseen word. The default is `1 + log(total_docs)`.
+        """
+        self.total_docs = total_docs
+        self.word_count = dict(word_count) if word_count else {}
+        self.default_idf = default_idf
+
+    def __len__(self):
+        return len(self.word_count)
+
+    def __contains__(self, word):
+        return word in self.word_count
+
+    def update(self, word_count, total_docs):
+        """Add document frequency of more documents to the model, e.g., another log file of the reference corpus.
+
+        Parameters
+        ----------
+        word_count  : dict
+            Document frequency of words in the documents.
+        total_docs  : int
+            Number of the documents.
+        """
+        for word, count in word_count.iteritems():
+            self.word_count[word] = self.word_count.get(word, 0) + count
+        self.total_docs += total_docs
+
+    def get_default_idf(self):
+        """Get the idf of a word which is not in the reference corpus.
+
+        Returns
+        -------
+        idf : float
+            `default_idf` if it is given, otherwise the idf of a word in a single document.
+        """
+        if self.default_idf is not None:
+            return self.default_idf
+
+        return 1 + log(self.total_docs) if self.total_docs else 1.
+
+    def get_idf(self, word):
+        """Get the inverse document frequency of a word.
+
+        Parameters
+        ----------
+        word    : str
+            A preprocessed word.
+
+        Returns
+        -------
+        idf     : float
+            The idf of the word.
+        """
+        count = self.word_count.get(word)
+        if not count:
+            return self.get_default_idf()
+
+        idf = 1 + log(float(self.total_docs) / count)
+        return idf
+
+    def save(self, model_file):
+        """Save the model to a file.
+
+        Parameters
+        ----------
+        model_file  : str
+            Path of the model file.
+        """
+        words = sorted(self.word_count)
+        counts = array('L', [self.word_count[word] for word in words])
+        model = {'version': self.version, 'total_docs': self.total_docs, 'default_idf': self.default_idf,
+                 'words': '\n'.join(words), 'counts': counts.tostring(), 'typecode': counts.typecode}
+        f = gzip.open(model_file, 'wb')
+        try:
+            cPickle.dump(model, f, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+
+    @classmethod
+    def load(cls, model_file):
+        """Load a model from a file written by `save`.
+
+        Parameters
+        ----------
+        model_file  : str
+            Path of the model file.
+
+        Returns
+        -------
+        idf_model   : IdfModel
+            The loaded model.
+        """
+        f = gzip.open(model_file, 'rb')
+        try:
+            model = cPickle.load(f)
+        finally:
+            f.close()
+
+        if model.get('version') != cls.version:
+            raise ValueError('Unsupported IDF model version: %r' % model.get('version'))
+
+        counts = array(model['typecode'])
+        counts.fromstring(model['counts'])
+        words = model['words'].split('\n') if model['words'] else []
+        idf_model = cls(model['total_docs'], dict(zip(words, counts)), model['default_idf'])
+        return idf_model
@@ -0,0 +1,183 @@
+from array import array
+import numpy as np
+
+
+class LogColumns(object):
+    """Header fields of parsed log lines stored as columns.
+
+    `LogGrammar` parses a line into a dictionary, and the fields other than the message and the timestamp, e.g.,
+    hostname, service, pid, port, and ip_address, are kept here as one integer column per field. A string field
+    is encoded as categorical codes, where `categories[field][code]` is the value, and a numeric field such as pid
+    or port keeps its integer value. A line without the field gets -1. The columns are returned as numpy arrays,
+    so grouping or filtering lines by a field is a vectorized operation instead of parsing the file again.
+    """
+    excluded_fields = ('message', 'timestamp')
+    numeric_fields = ('pid', 'port')
+    typecode = 'i'
+
+    def __init__(self):
+        """The constructor of class LogColumns.
+        """
+        self.length = 0
+        self.columns = {}       # key: field, value: array of codes or numeric values
+        self.categories = {}    # key: string field, value: list of values ordered by code
+        self.category_codes = {}    # key: string field, value: dictionary of value to code
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    def __get_code(self, field, value):
+        # get the categorical code of a value, a new code is added for an unseen value
+        codes = self.category_codes.setdefault(field, {})
+        code = codes.get(value)
+        if code is None:
+            categories = self.categories.setdefault(field, [])
+            code = len(categories)
+            codes[value] = code
+            categories.append(value)
+
+        return code
+
+    def add(self, parsed):
+        """Add the header fields of a parsed log line.
+
+        Parameters
+        ----------
+        parsed  : dict
+            A log line parsed by `LogGrammar`.
+        """
+        for field, value in parsed.iteritems():
+            if field in self.excluded_fields:
+                continue
+
+            # a field which first appears in this line is -1 in the previous lines
+            column = self.columns.get(field)
+            if column is None:
+                column = array(self.typecode, [-1]) * self.length
+                self.columns[field] = column
+
+            if field in self.numeric_fields:
+                column.append(int(value) if str(value).isdigit() else -1)
+            else:
+                column.append(self.__get_code(field, value))
+
+        self.length += 1
+        for column in self.columns.itervalues():
+            if len(column) < self.length:
+                column.append(-1)
+
+    def get_fields(self):
+        """Get the names of the columns.
+
+        Returns
+        -------
+        fields  : list[str]
+            Sorted field names.
+        """
+        return sorted(self.columns)
+
+    def get_column(self, field):
+        """Get the codes or numeric values of a field for all lines.
+
+        Parameters
+        ----------
+        field   : str
+            Name of the field, e.g., service.
+
+        Returns
+        -------
+        column  : numpy.ndarray
+            Read-only integer array indexed by line id, -1 if a line does not have the field.
+        """
+        # copy the buffer, so the array is still valid when more lines are added
+        column = np.frombuffer(self.columns[field].tostring(), dtype=np.intc)
+        return column
+
+    def get_values(self, field):
+        """Get the decoded values of a field for all lines.
+
+        Parameters
+        ----------
+        field   : str
+            Name of the field.
+
+        Returns
+        -------
+        values  : list
+            The value of every line, None if a line does not have the field.
+        """
+        column = self.columns[field]
+        if field in self.numeric_fields:
+            return [value if value >= 0 else None for value in column]
+
+        categories = self.categories.get(field, [])
+        return [categories[code] if code >= 0 else None for code in column]
+
+    def get_code(self, field, value):
+        """Get the categorical code of a value of a string field without adding it.
+
+        Parameters
+        ----------
+        field   : str
+            Name of the field.
+        value   : str
+            A value of the field.
+
+        Returns
+        -------
+        code    : int
+            The code of the value or -1 if it does not exist.
+        """
+        return self.category_codes.get(field, {}).get(value, -1)
+
+    def filter(self, field, value):
+        """Get the ids of lines which have a value in a field.
+
+        Parameters
+        ----------
+        field   : str
+            Name of the field.
+        value   : str or int
+            A string value or a numeric value for a numeric field.
+
+        Returns
+        -------
+        line_ids    : numpy.ndarray
+            Sorted line ids.
+        """
+        code = value if field in self.numeric_fields else self.get_code(field, value)
+        if code < 0:
+            return np.empty(0, dtype=np.intp)
+
+        return np.flatnonzero(self.get_column(field) == code)
+
+    def group_by(self, field):
+        """Group line ids by the value of a field.
+
+        Parameters
+        ----------
+        field   : str
+            Name of the field.
+
+        Returns
+        -------
+        groups  : dict
+            key: value of the field, value: sorted line ids as numpy.ndarray. Lines without the field are skipped.
+        """
+        column = self.get_column(field)
+        order = np.argsort(column, kind='mergesort')
+        codes, starts = np.unique(column[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+
+        groups = {}
+        categories = self.categories.get(field, [])
+        for code, start, end in zip(codes, starts, ends):
+            if code < 0:
+                continue
+            value = int(code) if field in self.numeric_fields else categories[code]
+            groups[value] = order[start:end]
+
+        return groups
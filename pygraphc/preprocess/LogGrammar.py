@@ -1,21 +1,35 @@
 from pyparsing import Word, alphas, Suppress, Combine, nums, string, Optional, Regex, ParseException
+import re
 
 
 class LogGrammar(object):
     """A class to define the format (grammar) of a log file.
 
     We heavily rely on pyparsing in this case. The code for auth.log grammar is derived from syslog parser
-    by L. Silva [Silva2012]_.
+    by L. Silva [Silva2012]_. Since pyparsing is slow for millions of lines, each grammar also has a precompiled
+    regular expression which yields the same tokens. A line which does not match the regular expression is parsed
+    by the pyparsing grammar as before.
 
     References
     ----------
     .. [Silva2012] L. Silva, Parsing syslog files with Python and PyParsing, 2012.
                    https://gist.github.com/leandrosilva/3651640
     """
-    def __init__(self, log_type=None):
+    aliases = {'bluegene-logs': 'bluegene'}     # key: old name of a log type, value: log type
+
+    def __init__(self, log_type=None, fast_parse=True):
         """The constructor of LogGrammar.
+
+        Parameters
+        ----------
+        log_type    : str
+            Type of event log.
+        fast_parse  : bool
+            Parse with the precompiled regular expression first and use the pyparsing grammar only as a fallback.
         """
-        self.log_type = log_type
+        self.log_type = self.aliases.get(log_type, log_type)
+        self.fast_parse = fast_parse
+        self.log_regex = self.__get_regex(self.log_type)
         if self.log_type == 'auth':
             self.authlog_grammar = self.__get_authlog_grammar()
         elif self.log_type == 'kippo':
@@ -37,6 +51,140 @@ class LogGrammar(object):
         elif self.log_type == 'messages_casper_rw':
             self.messages_casper_rw_grammar = self.__get_messages_casper_rw_grammar()
 
+    @staticmethod
+    def __get_regex(log_type):
+        """The definition of regular expressions equivalent to the pyparsing grammars.
+
+        Every token separator allows the whitespace skipped by pyparsing. Groups of the optional elements are
+        None if the elements do not exist, so the remaining groups are the same as the pyparsing tokens.
+
+        Parameters
+        ----------
+        log_type    : str
+            Type of event log.
+
+        Returns
+        -------
+        log_regex   : _sre.SRE_Pattern
+            Compiled regular expression for the log type or None if the log type is unknown.
+        """
+        ws = r'[ \t\r\n]*'
+        sep = r'[ \t\r\n]+'
+        timestamp = r'([A-Z][a-z]{2})' + sep + r'(\d+)' + sep + r'(\d+:\d+:\d+)'
+        syslog = '^' + ws + timestamp + sep + r'([A-Za-z0-9_.-]+)' + sep + r'([A-Za-z/_.-]+)' + \
+            r'(?:' + ws + r'\(' + ws + r'([A-Za-z_]+)' + ws + r'\))?' + \
+            r'(?:' + ws + r'\[' + ws + r'(\d+)' + ws + r'\])?(?:' + ws + ':)?' + ws + '(.*)'
+        patterns = {
+            'auth': '^' + ws + timestamp + sep + r'([A-Za-z0-9_.-]+)' + sep + r'([A-Za-z/_.-]+)' +
+                    r'(?:' + ws + r'\[' + ws + r'(\d+)' + ws + r'\])?' + ws + ':' + ws + '(.*)',
+            'kippo': '^' + ws + r'(\d+-\d+-\d+)' + sep + r'(\d+:\d+:\d+\+0000)' + ws + r'\[' + ws +
+                     r'([A-Za-z0-9.() -]+)(?:' + ws + ',' + ws + r'(\d+)' + ws + ',' + ws + r'([0-9.]+))?' +
+                     ws + r'\]' + ws + '(.*)',
+            'syslog': syslog,
+            'bluegene': '^' + ws + r'([A-Za-z_-]+)' + sep + r'(\d+)' + sep + r'(\d+\.\d+\.\d+)' + sep +
+                        r'([A-Za-z0-9:_-]+)' + sep + r'(\d+-\d+-\d+-\d+\.\d+\.\d+\.\d+)' + sep +
+                        r'([A-Za-z0-9:_-]+)' + sep + r'([A-Za-z]+)' + sep + r'([A-Za-z]+)' + sep +
+                        r'([A-Za-z]+)' + ws + '(.*)',
+            'raslog': '^' + ws + r'(\d+)' + sep + r'(\w+)' + sep + r'([A-Za-z]+)' + sep + r'(\w+)' + sep +
+                      r'(\w+)' + sep + r'([A-Za-z]+)' + sep + r'(\d+-\d+-\d+-\d+\.\d+\.\d+\.\d+)' + sep +
+                      r'([0-9-]+)' + sep + r'([0-9-]+)' + sep + r'([0-9-]+)' + sep + r'([A-Za-z0-9_-]+)' + sep +
+                      r'([A-Za-z0-9-]+)' + sep + r'([A-Za-z0-9]+)' + sep + r"([A-Za-z0-9']+)" + ws + '(.*)',
+            'vpnlog': '^' + ws + r'([A-Z][a-z]{2})' + sep + timestamp + sep + r'(\d+)' +
+                      r'(?:' + ws + r'([A-Za-z0-9._/]+)' + ws + ':' + ws + r'(\d+))?' + ws + '(.*)',
+            'snort_secrepo': '^' + ws + r'([0-9/:.-]+)' + sep + r'([A-Za-z\[*\]]+)' + sep +
+                             r'([A-Za-z0-9\[:\]]+)' + ws + '(.*)',
+            'snort_sotm34': '^' + ws + timestamp + sep + r'([A-Za-z]+)' + sep + r'([A-Za-z:]+)' + sep +
+                            r'([0-9\[:\]]+)' + ws + '(.*)',
+            'httpd_error_chuvakin': '^' + ws + r'([\[A-Za-z]+)' + sep + r'([A-Za-z]+)' + sep + r'(\d+)' + sep +
+                                    r'(\d+:\d+:\d+)' + sep + r'([0-9\]]+)' + sep + r'([\[A-Za-z\]]+)' + ws + '(.*)',
+            'messages_casper_rw': syslog
+        }
+
+        log_regex = re.compile(patterns[log_type]) if log_type in patterns else None
+        return log_regex
+
+    def __parse_tokens(self, grammar, log_line):
+        """Get tokens of a log line with the regular expression or with the pyparsing grammar as a fallback.
+
+        pyparsing expands tabs before parsing, so does the regular expression.
+
+        Parameters
+        ----------
+        grammar     :
+            The pyparsing grammar of the log type.
+        log_line    : str
+            A log line to be parsed.
+
+        Returns
+        -------
+        tokens      : list[str]
+            Parsed tokens in the same order as the pyparsing result.
+        """
+        if self.fast_parse and self.log_regex:
+            matched = self.log_regex.match(log_line.expandtabs())
+            if matched:
+                tokens = [token for token in matched.groups() if token is not None]
+                return tokens
+
+        tokens = grammar.parseString(log_line)
+        return tokens
+
+    def get_parser(self):
+        """Get the parse method for the log type of this grammar.
+
+        Returns
+        -------
+        parser  : callable
+            Parse method which receives a log line and returns a dictionary of parsed fields.
+        """
+        parsers = {
+            'auth': self.parse_authlog,
+            'kippo': self.parse_kipplog,
+            'syslog': self.parse_syslog,
+            'bluegene': self.parse_bluegenelog,
+            'raslog': self.parse_raslog,
+            'vpnlog': self.parse_vpnlog,
+            'snort_secrepo': self.parse_snort_secrepo,
+            'snort_sotm34': self.parse_snort_sotm34,
+            'httpd_error_chuvakin': self.parse_httpd_error_chuvakin,
+            'messages_casper_rw': self.parse_messages_casper_rw
+        }
+        parser = parsers[self.log_type]
+        return parser
+
+    def check_parity(self, log_file):
+        """Compare the regular expression parser with the pyparsing grammar on a sample log file.
+
+        Parameters
+        ----------
+        log_file    : str
+            Path of a sample log file.
+
+        Returns
+        -------
+        mismatches  : list[tuple]
+            List of tuple where a tuple consists of line id, result of regular expression parser, and
+            result of pyparsing grammar. Empty list means both parsers are identical for the sample.
+        """
+        parser = self.get_parser()
+        fast_parse = self.fast_parse
+        mismatches = []
+        with open(log_file, 'r') as f:
+            for line_id, line in enumerate(f):
+                results = []
+                for status in (True, False):
+                    self.fast_parse = status
+                    try:
+                        results.append(parser(line))
+                    except ParseException:
+                        results.append(None)
+
+                if results[0] != results[1]:
+                    mismatches.append((line_id, results[0], results[1]))
+
+        self.fast_parse = fast_parse
+        return mismatches
+
     @staticmethod
     def __get_authlog_grammar():
         """The definition of auth.log grammar.
@@ -76,7 +224,7 @@ class LogGrammar(object):
         parsed  : dict[str, str]
             A parsed auth.log containing these elements: timestamp, hostname, service, pid, and message.
         """
-        parsed_authlog = self.authlog_grammar.parseString(log_line)
+        parsed_authlog = self.__parse_tokens(self.authlog_grammar, log_line)
 
         # get parsed auth.log
         parsed = dict()
@@ -139,7 +287,7 @@ class LogGrammar(object):
             A parsed Kippo honeypot log (kippo.log) containing these elements:
             timestamp, service, message, port (optional), IP address (optional).
         """
-        parsed_kippolog = self.kippolog_grammar.parseString(log_line)
+        parsed_kippolog = self.__parse_tokens(self.kippolog_grammar, log_line)
         parsed = dict()
         parsed['timestamp'] = parsed_kippolog[0] + ' ' + parsed_kippolog[1]
         if len(parsed_kippolog) < 5:
@@ -194,7 +342,7 @@ class LogGrammar(object):
             A parsed syslog (or messages in RedHat-based Linux) containing these elements:
             timestamp, hostname, service, message, time in second (optional), and pid (optional).
         """
-        parsed_syslog = self.syslog_grammar.parseString(log_line)
+        parsed_syslog = self.__parse_tokens(self.syslog_grammar, log_line)
 
         parsed = dict()
         parsed['timestamp'] = parsed_syslog[0] + ' ' + parsed_syslog[1] + ' ' + parsed_syslog[2]
@@ -266,7 +414,7 @@ class LogGrammar(object):
         """
         parsed = dict()
         try:
-            parsed_bluegenelog = self.bluegene_grammar.parseString(log_line)
+            parsed_bluegenelog = self.__parse_tokens(self.bluegene_grammar, log_line)
             parsed['sock'] = parsed_bluegenelog[0]
             parsed['number'] = parsed_bluegenelog[1]
             parsed['date'] = parsed_bluegenelog[2]
@@ -337,7 +485,7 @@ class LogGrammar(object):
         parsed      : dict[str, str]
             A parsed RAS log.
         """
-        parsed_raslog = self.raslog_grammar.parseString(log_line)
+        parsed_raslog = self.__parse_tokens(self.raslog_grammar, log_line)
 
         parsed = dict()
         parsed['recid'] = parsed_raslog[0]
@@ -376,7 +524,7 @@ class LogGrammar(object):
         return vpnlog_grammar
 
     def parse_vpnlog(self, log_line):
-        parsed_vpnlog = self.vpnlog_grammar.parseString(log_line)
+        parsed_vpnlog = self.__parse_tokens(self.vpnlog_grammar, log_line)
 
         parsed = dict()
         if len(parsed_vpnlog) == 6:
@@ -402,7 +550,7 @@ class LogGrammar(object):
         return snort_secrepo_grammar
 
     def parse_snort_secrepo(self, log_line):
-        parsed_snort_secrepo = self.snort_secrepo_grammar.parseString(log_line)
+        parsed_snort_secrepo = self.__parse_tokens(self.snort_secrepo_grammar, log_line)
 
         parsed = dict()
         parsed['timestamp'] = parsed_snort_secrepo[0]
@@ -431,7 +579,7 @@ class LogGrammar(object):
         return snort_sotm34_grammar
 
     def parse_snort_sotm34(self, log_line):
-        parsed_snort_sotm34 = self.snort_sotm34_grammar.parseString(log_line)
+        parsed_snort_sotm34 = self.__parse_tokens(self.snort_sotm34_grammar, log_line)
 
         parsed = dict()
         parsed['timestamp'] = parsed_snort_sotm34[0] + ' ' + parsed_snort_sotm34[1] + ' ' + parsed_snort_sotm34[2]
@@ -463,7 +611,7 @@ class LogGrammar(object):
     def parse_httpd_error_chuvakin(self, log_line):
         parsed = dict()
         try:
-            parsed_httpd_error_chuvakin = self.httpd_error_chuvakin_grammar.parseString(log_line)
+            parsed_httpd_error_chuvakin = self.__parse_tokens(self.httpd_error_chuvakin_grammar, log_line)
             parsed['timestamp'] = parsed_httpd_error_chuvakin[0] + ' ' + parsed_httpd_error_chuvakin[1] + ' ' + \
                 parsed_httpd_error_chuvakin[2] + ' ' + parsed_httpd_error_chuvakin[3] + ' ' + \
                 parsed_httpd_error_chuvakin[4]
@@ -518,7 +666,7 @@ class LogGrammar(object):
             A parsed syslog (or messages in RedHat-based Linux) containing these elements:
             timestamp, hostname, service, message, time in second (optional), and pid (optional).
         """
-        parsed_syslog = self.messages_casper_rw_grammar.parseString(log_line)
+        parsed_syslog = self.__parse_tokens(self.messages_casper_rw_grammar, log_line)
 
         parsed = dict()
         parsed['timestamp'] = parsed_syslog[0] + ' ' + parsed_syslog[1] + ' ' + parsed_syslog[2]
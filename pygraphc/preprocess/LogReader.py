@@ -0,0 +1,232 @@
+from array import array
+from bisect import bisect_right
+import bz2
+import gzip
+import mmap
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+
+class LogReader(object):
+    """A read-only and memory-mapped log file which hands out lines by line id.
+
+    The file is memory-mapped and only the start offset of every line is stored in an array, instead of
+    keeping every line as a separate string as `readlines()` does. A line is sliced from the map when it is
+    requested, so the object can replace the list of original logs, e.g., in `OutputText`. Each line keeps its
+    trailing newline like `readlines()`.
+
+    A log file compressed with gzip, bzip2, or xz is detected from its magic bytes. It is decompressed once as a
+    stream of blocks in memory, without writing the decompressed file to disk, and the line offsets are counted in
+    the same pass. Every block ends at a line boundary, so a line is sliced from a single block and the blocks are
+    never joined into a single string. A pickled reader keeps the decompressed blocks, so a process gets the
+    decompressed lines without decompressing the file again. The line ids are the same as in the decompressed
+    file. xz needs the `lzma` module (`backports.lzma` in Python 2).
+    """
+    magic_bytes = (('\x1f\x8b', 'gzip'), ('BZh', 'bz2'), ('\xfd7zXZ\x00', 'xz'))
+    block_size = 1 << 20
+
+    def __init__(self, log_file):
+        """The constructor of class LogReader.
+
+        Parameters
+        ----------
+        log_file    : str
+            Path of a log file.
+        """
+        self.log_file = log_file
+        self.compression = self.get_compression(log_file)
+        self.offsets = array('L')
+        self.__file = None
+        self.__map = None
+        self.__blocks = None
+        self.__block_starts = None
+        self.__open()
+        if not self.compression:
+            self.__get_offsets()
+
+    @staticmethod
+    def get_compression(log_file):
+        """Detect compression of a log file from its magic bytes.
+
+        Parameters
+        ----------
+        log_file    : str
+            Path of a log file.
+
+        Returns
+        -------
+        compression : str
+            Compression type, i.e., gzip, bz2, xz, or None for an uncompressed file.
+        """
+        with open(log_file, 'rb') as f:
+            header = f.read(6)
+
+        for magic, compression in LogReader.magic_bytes:
+            if header.startswith(magic):
+                return compression
+
+        return None
+
+    def __decompress(self):
+        """Decompress the log file as a stream of blocks in memory and build the line offsets in the same pass.
+
+        The part of a block after its last newline is carried to the next block, so every block ends at a line
+        boundary. The last line may not end with a newline.
+        """
+        if self.compression == 'gzip':
+            f = gzip.GzipFile(self.log_file, 'rb')
+        elif self.compression == 'bz2':
+            f = bz2.BZ2File(self.log_file, 'rb')
+        else:
+            if lzma is None:
+                raise ImportError('Reading xz compressed logs requires lzma or backports.lzma.')
+            f = lzma.LZMAFile(self.log_file, 'rb')
+
+        # add the offset after every newline of a block and keep the block up to its last newline
+        offsets = array('L', [0])
+        blocks = []
+        block_starts = array('L')
+        size = 0
+        rest = ''
+        try:
+            block = f.read(self.block_size)
+            while block:
+                block = rest + block if rest else block
+                end = block.rfind('\n') + 1
+                rest = block[end:]
+                if end:
+                    find = block.find
+                    position = find('\n')
+                    while position != -1:
+                        offsets.append(size + position + 1)
+                        position = find('\n', position + 1)
+                    blocks.append(block[:end] if rest else block)
+                    block_starts.append(size)
+                    size += end
+                block = f.read(self.block_size)
+        finally:
+            f.close()
+
+        # the last line may not end with a newline
+        if rest:
+            blocks.append(rest)
+            block_starts.append(size)
+            size += len(rest)
+            offsets.append(size)
+
+        self.offsets = offsets
+        self.__blocks = blocks
+        self.__block_starts = block_starts
+
+    def __open(self):
+        # decompress a compressed log file in memory
+        if self.compression:
+            self.__decompress()
+            return
+
+        # memory-map the log file
+        self.__file = open(self.log_file, 'rb')
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be memory-mapped
+            self.__map = ''
+
+    def __get_offsets(self):
+        """Build the line-offset index. The last offset is the file size, so line i is [offsets[i], offsets[i+1]).
+        """
+        offsets = array('L', [0])
+        size = len(self.__map)
+        find = self.__map.find
+        position = find('\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = find('\n', position + 1)
+
+        # the last line may not end with a newline
+        if offsets[-1] != size:
+            offsets.append(size)
+
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, line_id):
+        """Get a line or a list of lines by line id.
+
+        Parameters
+        ----------
+        line_id : int or slice
+            Line identifier, starting from 0.
+
+        Returns
+        -------
+        line    : str or list[str]
+            A log line with its trailing newline, or a list of log lines for a slice.
+        """
+        if isinstance(line_id, slice):
+            return [self[index] for index in xrange(*line_id.indices(len(self)))]
+
+        if line_id < 0:
+            line_id += len(self)
+        if not 0 <= line_id < len(self):
+            raise IndexError('line id out of range')
+
+        start, end = self.offsets[line_id], self.offsets[line_id + 1]
+        if self.__blocks is None:
+            return self.__map[start:end]
+
+        # slice the line from the block where it starts
+        block_id = bisect_right(self.__block_starts, start) - 1
+        block_start = self.__block_starts[block_id]
+        return self.__blocks[block_id][start - block_start:end - block_start]
+
+    def __iter__(self):
+        for line_id in xrange(len(self)):
+            yield self[line_id]
+
+    def __getstate__(self):
+        # a memory map cannot be pickled, it is opened again after unpickling.
+        # the decompressed blocks of a compressed log file are pickled, so it is not decompressed again.
+        state = {'log_file': self.log_file, 'compression': self.compression, 'offsets': self.offsets}
+        if self.compression:
+            state['blocks'] = self.__blocks
+            state['block_starts'] = self.__block_starts
+        return state
+
+    def __setstate__(self, state):
+        self.log_file = state['log_file']
+        self.compression = state['compression']
+        self.offsets = state['offsets']
+        self.__file = None
+        self.__map = None
+        self.__blocks = state.get('blocks')
+        self.__block_starts = state.get('block_starts')
+        if not self.compression:
+            self.__open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the memory map and the log file. The decompressed blocks of a compressed log file are released.
+        """
+        if self.__file:
+            if self.__map:
+                self.__map.close()
+            self.__file.close()
+            self.__file = None
+        if self.__blocks:
+            self.__blocks = []
+            self.__block_starts = array('L')
+            self.offsets = array('L', [0])
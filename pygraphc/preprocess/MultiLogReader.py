@@ -0,0 +1,87 @@
+from array import array
+from bisect import bisect_right
+from pygraphc.preprocess.LogReader import LogReader
+
+
+class MultiLogReader(object):
+    """Several log files read as one log with global line ids.
+
+    The files are concatenated in the given order, so the global line id of line `i` in file `k` is the total
+    number of lines in the files before `k` plus `i`. Every file is opened with `LogReader`, so it is memory-mapped
+    or decompressed once in memory. `get_source` gives the file and the line id in the file of a global line id.
+    """
+    def __init__(self, log_files):
+        """The constructor of class MultiLogReader.
+
+        Parameters
+        ----------
+        log_files   : list[str]
+            Paths of log files in the order of concatenation.
+        """
+        self.log_files = list(log_files)
+        self.readers = [LogReader(log_file) for log_file in self.log_files]
+        self.starts = array('l', [0])
+        for reader in self.readers:
+            self.starts.append(self.starts[-1] + len(reader))
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def get_source(self, line_id):
+        """Get the file and the line id in the file of a global line id.
+
+        Parameters
+        ----------
+        line_id     : int
+            Global line identifier, starting from 0.
+
+        Returns
+        -------
+        file_index  : int
+            Index of the file in `log_files`.
+        file_line_id: int
+            Line identifier in the file, starting from 0.
+        """
+        if line_id < 0:
+            line_id += len(self)
+        if not 0 <= line_id < len(self):
+            raise IndexError('line id out of range')
+
+        file_index = bisect_right(self.starts, line_id) - 1
+        return file_index, line_id - self.starts[file_index]
+
+    def __getitem__(self, line_id):
+        """Get a line or a list of lines by global line id.
+
+        Parameters
+        ----------
+        line_id : int or slice
+            Global line identifier, starting from 0.
+
+        Returns
+        -------
+        line    : str or list[str]
+            A log line with its trailing newline, or a list of log lines for a slice.
+        """
+        if isinstance(line_id, slice):
+            return [self[index] for index in xrange(*line_id.indices(len(self)))]
+
+        file_index, file_line_id = self.get_source(line_id)
+        return self.readers[file_index][file_line_id]
+
+    def __iter__(self):
+        for reader in self.readers:
+            for line in reader:
+                yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close all log files.
+        """
+        for reader in self.readers:
+            reader.close()
@@ -1,12 +1,26 @@
-from re import sub
-from nltk import corpus
-import multiprocessing
-import datefinder
+from array import array
+from collections import Counter
+from copy import copy
+from itertools import izip
+from pygraphc.preprocess.EventRecord import EventRecord
+from pygraphc.preprocess.LogReader import LogReader
+from pygraphc.preprocess.MultiLogReader import MultiLogReader
+from pygraphc.preprocess.PreprocessCache import PreprocessCache
+from pygraphc.preprocess.TextNormalizer import TextNormalizer
+from pygraphc.preprocess.Vocabulary import Vocabulary
+from pygraphc.preprocess.WorkerPool import WorkerPool
 
 
 class ParallelPreprocess(object):
-    def __init__(self, log_file, refine_unique_events=True, count_groups=None):
+    cached_attributes = ('unique_events', 'unique_events_length', 'event_attributes', 'preprocessed_logs',
+                         'preprocessed_logs_groundtruth', 'preprocessed_logs_ids', 'vocabulary', 'word_count')
+
+    def __init__(self, log_file, refine_unique_events=True, count_groups=None, collapse_duplicates=True,
+                 prefix_fields=4, cache_dir=None, cache_size=1 << 30, chunksize=None, masker=None, token_ids=False):
+        # token_ids also keeps every event and preprocessed log as an array of ids in `vocabulary`, e.g., for
+        # ParallelCosineSimilarity with token_ids or the evaluation indices with `preprocessed_logs_ids`.
         self.log_file = log_file
+        self.log_files = list(log_file) if isinstance(log_file, (list, tuple)) else None
         self.logs = []
         self.log_length = 0
         self.preprocessed_logs = {}
@@ -19,36 +33,42 @@ class ParallelPreprocess(object):
         self.events_withduplicates_length = 0
         self.log_grammar = None
         self.preprocessed_logs_groundtruth = {}
-
-    def __call__(self, line):
-        # main method called when running in multiprocessing
-        return self.__get_events(line)
+        self.normalizer = TextNormalizer()
+        self.collapse_duplicates = collapse_duplicates
+        self.prefix_fields = prefix_fields
+        self.vocabulary = Vocabulary()
+        self.preprocessed_logs_ids = {}
+        self.cache = PreprocessCache(cache_dir, cache_size) if cache_dir else None
+        self.chunksize = chunksize
+        self.word_count = {}
+        self.masker = masker
+        self.token_ids = token_ids
+
+    def __call__(self, task):
+        # main method called when running in multiprocessing. a task is a log line with its id or the lines of a
+        # log file in a LogReader.
+        if isinstance(task, LogReader):
+            return self.__get_partial_events(task)
+        return self.__get_events(task)
 
     def __read_log(self):
-        """Read a log file.
+        """Read a log file or several log files as one log. The lines are memory-mapped and read lazily by line id.
         """
-        with open(self.log_file, 'rb') as f:
-            self.logs = f.readlines()
+        self.logs = MultiLogReader(self.log_files) if self.log_files else LogReader(self.log_file)
         self.log_length = len(self.logs)
 
-    @staticmethod
-    def __get_events(logs_with_id):
+    def __get_events(self, logs_with_id):
         log_index, line = logs_with_id
         line = line.lower()
 
-        # GET month
-        matches = datefinder.find_dates(line, source=True)
-        months = []
-        for match in matches:
-            month = sub('[^a-zA-Z]', '', match[1])
-            if month:
-                months.append(month)
+        # GET month and day names in dates
+        line = line.split()
+        datewords = self.normalizer.get_datewords(line)
 
         # only leave alphabet, maintain word split
-        line = line.split()
         line_split = []
         for li in line:
-            alphabet_only = sub('[^a-zA-Z]', '', li)
+            alphabet_only = self.normalizer.get_alphabet(li)
             line_split.append(alphabet_only)
 
         # GET preprocessed_event_countgroup
@@ -67,13 +87,8 @@ class ParallelPreprocess(object):
         line = ' '.join(line_split)
         line = ' '.join(line.split())
 
-        # remove stopwords
-        stopwords = corpus.stopwords.words('english')
-        stopwords_month = stopwords
-        if months:
-            stopwords_month.extend(months)
-
-        stopwords_result = [word for word in line.split() if word not in stopwords_month]
+        # remove stopwords, month and day names in dates
+        stopwords_result = self.normalizer.remove_stopwords(line.split(), datewords)
         preprocessed_events = ' '.join(stopwords_result)
         preprocessed_events_graphedge = preprocessed_events
 
@@ -81,49 +96,266 @@ class ParallelPreprocess(object):
                                 preprocessed_events_graphedge)
         return preprocessed_with_id
 
-    def get_unique_events(self):
-        # read logs
-        self.__read_log()
+    def __get_duplicate_key(self, line):
+        """Get a key which is equal for log lines with the same preprocessing result.
+
+        The timestamp and host prefix (the first `prefix_fields` fields) only contributes its alphabet characters
+        to preprocessing, so the prefix is reduced to them. The message body is kept as is. The month and day
+        names in dates are added, since they depend on the numbers in the prefix. Therefore, two lines with the
+        same key always give the same preprocessed events.
+
+        Parameters
+        ----------
+        line    : str
+            A log line.
+
+        Returns
+        -------
+        key     : tuple
+            Alphabet-only prefix fields, the lower case message body, and month and day names in dates.
+        """
+        fields = line.lower().split(None, self.prefix_fields)
+        body = fields.pop() if len(fields) > self.prefix_fields else ''
+        prefix = tuple(self.normalizer.get_alphabet(field) for field in fields)
+        datewords = self.normalizer.get_datewords(line.lower().split())
+        key = (prefix, body, datewords)
+        return key
+
+    def __mask(self, line):
+        """Replace variable tokens in the message body of a log line with typed placeholders of `masker`.
+
+        Parameters
+        ----------
+        line    : str
+            A log line.
+
+        Returns
+        -------
+        line    : str
+            Lower case log line with placeholders in the message body. The prefix fields are not masked.
+        """
+        fields = line.lower().split(None, self.prefix_fields)
+        if len(fields) > self.prefix_fields:
+            fields[-1] = self.masker.mask(fields[-1])
+
+        line = ' '.join(fields)
+        return line
+
+    def __get_distinct_logs(self, logs):
+        """Collapse log lines with exactly the same message into a single representative line.
+
+        Parameters
+        ----------
+        logs            : LogReader
+            Log lines of a log file.
+
+        Returns
+        -------
+        logs_with_id    : list[tuple]
+            List of (log id, log line) of the first line of every distinct message.
+        representatives : array.array
+            Log id of the representative line for every log line.
+        """
         logs_with_id = []
-        for index, log in enumerate(self.logs):
+        representatives = array('L')
+        distinct_logs = {}  # key: duplicate key, value: log id of the first line
+        for index, log in enumerate(logs):
+            # mask variable tokens before collapsing, so lines which only differ in them are preprocessed once
+            if self.masker:
+                log = self.__mask(log)
+
+            if self.collapse_duplicates:
+                key = self.__get_duplicate_key(log)
+                if key in distinct_logs:
+                    representatives.append(distinct_logs[key])
+                    continue
+                distinct_logs[key] = index
+
+            representatives.append(index)
             logs_with_id.append((index, log))
 
-        # run preprocessing in parallel
-        total_cpu = multiprocessing.cpu_count()
-        pool = multiprocessing.Pool(processes=total_cpu)
-        events = pool.map(self, logs_with_id)
-        pool.close()
-        pool.join()
+        return logs_with_id, representatives
 
-        # get graph event_attributes
-        unique_events_only = {}
-        unique_event_id = 0
+    def __load_cache(self, key):
+        """Load unique events and preprocessed logs from the cache.
+
+        Parameters
+        ----------
+        key     : str
+            The cache key of the log file.
+
+        Returns
+        -------
+        status  : bool
+            True if the cache entry exists and is loaded.
+        """
+        cached = self.cache.load(key)
+        if cached is None:
+            return False
+
+        for name, value in cached.iteritems():
+            setattr(self, name, value)
+        return True
+
+    def __save_cache(self, key):
+        # save unique events and preprocessed logs to the cache
+        cached = {}
+        for name in self.cached_attributes:
+            cached[name] = getattr(self, name)
+        self.cache.save(key, cached)
+
+    def __get_partial_events(self, logs):
+        """Preprocess a single log file into a partial event table.
+
+        Parameters
+        ----------
+        logs        : LogReader
+            Log lines of the file.
+
+        Returns
+        -------
+        partial     : dict
+            Partial event table of the file with these keys: `log_length`, `events` (list of tuple of preprocessed
+            event, count groups, graph edge event, and member line ids in the file, in the order of their first
+            line), `line_events` (index in `events` of every line), `line_countgroups` (count group of every
+            line), and `word_count` (document frequency of words in preprocessed events).
+        """
+        # collapse duplicate messages and preprocess only distinct messages with the shared pool.
+        # a copy without the logs is sent to the processes.
+        logs_with_id, representatives = self.__get_distinct_logs(logs)
+        worker = copy(self)
+        worker.logs = []
+        distinct_events = WorkerPool.imap(worker, logs_with_id, len(logs_with_id), self.chunksize)
+        distinct_events = dict((event[0], event[1:]) for event in distinct_events)
+
+        # fan out the result of each distinct message to all of its lines and group them by preprocessed event
+        events = []
+        events_index = {}       # key: preprocessed event, value: index in events
+        count_groups_only = []  # set of preprocessed event count group of every event
+        line_events = array('L')
+        line_countgroups = []
+        for log_id, representative in enumerate(representatives):
+            event, preprocessed_event_countgroup, preprocessed_events_graphedge = distinct_events[representative]
+            index = events_index.get(event)
+            if index is None:
+                index = len(events)
+                events_index[event] = index
+                events.append((event, [preprocessed_event_countgroup], preprocessed_events_graphedge, array('I')))
+                count_groups_only.append({preprocessed_event_countgroup})
+            elif preprocessed_event_countgroup not in count_groups_only[index]:
+                count_groups_only[index].add(preprocessed_event_countgroup)
+                events[index][1].append(preprocessed_event_countgroup)
+
+            events[index][3].append(log_id)
+            line_events.append(index)
+            line_countgroups.append(preprocessed_event_countgroup)
+
+        # document frequency of words
+        word_count = Counter()
+        for event, count_groups, preprocessed_events_graphedge, members in events:
+            for word in set(event.split()):
+                word_count[word] += len(members)
+
+        partial = {'log_length': len(logs), 'events': events, 'line_events': line_events,
+                   'line_countgroups': line_countgroups, 'word_count': word_count}
+        return partial
+
+    def __merge_partial_events(self, partials):
+        """Merge partial event tables of log files into unique events in the order of the files.
+
+        The line ids of a file are shifted by the number of lines in the files before it, so the unique events,
+        their members, and the preprocessed logs are the same as preprocessing the concatenated files. The
+        document frequencies are summed.
+
+        Parameters
+        ----------
+        partials            : iterable
+            Partial event tables from `__get_partial_events` in the order of the files.
+
+        Returns
+        -------
+        unique_events_list  : list[list[str]]
+            Words of the preprocessed event of every unique event.
+        """
+        unique_events_only = {}     # key: preprocessed event, value: unique event id
+        count_groups_only = {}      # key: unique event id, value: set of preprocessed event count group
         unique_events_list = []
-        for log_id, event, preprocessed_event_countgroup, preprocessed_events_graphedge in events:
-            event_split = event.split()
-            preprocessed_event_countgroup_split = preprocessed_event_countgroup.split()
-            if event not in unique_events_only.values():
-                unique_events_only[unique_event_id] = event
-                count_group = [preprocessed_event_countgroup_split]
-                self.event_attributes[unique_event_id] = {'preprocessed_event': event_split,
-                                                          'preprocessed_event_countgroup': count_group,
-                                                          'preprocessed_events_graphedge':
-                                                              preprocessed_events_graphedge,
-                                                          'cluster': unique_event_id,
-                                                          'member': [log_id]}
-                unique_event_id += 1
-                unique_events_list.append(event_split)
-
-            else:
-                for index, attr in self.event_attributes.iteritems():
-                    if event_split == attr['preprocessed_event']:
-                        attr['member'].append(log_id)
-                        if preprocessed_event_countgroup_split not in attr['preprocessed_event_countgroup']:
-                            attr['preprocessed_event_countgroup'].append(preprocessed_event_countgroup_split)
+        word_count = Counter()
+        offset = 0
+        for partial in partials:
+            unique_event_ids = array('L')   # unique event id of every event in the partial table
+            for event, count_groups, preprocessed_events_graphedge, members in partial['events']:
+                members = array('I', [offset + member for member in members])
+                if event not in unique_events_only:
+                    unique_event_id = len(unique_events_list)
+                    event_split = event.split()
+                    unique_events_only[event] = unique_event_id
+                    count_groups_only[unique_event_id] = set(count_groups)
+                    attr = EventRecord({'preprocessed_event': event_split,
+                                        'preprocessed_event_countgroup': [group.split() for group in count_groups],
+                                        'preprocessed_events_graphedge': preprocessed_events_graphedge,
+                                        'cluster': unique_event_id,
+                                        'member': members})
+                    if self.token_ids:
+                        attr['preprocessed_event_ids'] = self.vocabulary.get_ids(event_split)
+                    self.event_attributes[unique_event_id] = attr
+                    unique_events_list.append(event_split)
+
+                else:
+                    unique_event_id = unique_events_only[event]
+                    attr = self.event_attributes[unique_event_id]
+                    attr['member'].extend(members)
+                    for preprocessed_event_countgroup in count_groups:
+                        if preprocessed_event_countgroup not in count_groups_only[unique_event_id]:
+                            count_groups_only[unique_event_id].add(preprocessed_event_countgroup)
+                            attr['preprocessed_event_countgroup'].append(preprocessed_event_countgroup.split())
+
+                unique_event_ids.append(unique_event_id)
 
             # get preprocessed logs as dictionary
-            self.preprocessed_logs[log_id] = event
-            self.preprocessed_logs_groundtruth[log_id] = preprocessed_event_countgroup
+            events = partial['events']
+            for line_id, (index, preprocessed_event_countgroup) in \
+                    enumerate(izip(partial['line_events'], partial['line_countgroups'])):
+                log_id = offset + line_id
+                attr = self.event_attributes[unique_event_ids[index]]
+                self.preprocessed_logs[log_id] = events[index][0]
+                if self.token_ids:
+                    self.preprocessed_logs_ids[log_id] = attr['preprocessed_event_ids']
+                self.preprocessed_logs_groundtruth[log_id] = preprocessed_event_countgroup
+
+            word_count.update(partial['word_count'])
+            offset += partial['log_length']
+
+        self.word_count = dict(word_count)
+        return unique_events_list
+
+    def get_unique_events(self):
+        # read logs
+        self.__read_log()
+
+        # load preprocessing results of the same log content and options if the cache is enabled
+        cache_key = None
+        if self.cache:
+            options = {'refine_unique_events': self.refine_unique_events}
+            if self.masker:
+                options['masker'] = self.masker.get_key()
+            if self.token_ids:
+                options['token_ids'] = True
+            cache_key = self.cache.get_key(self.log_file, options)
+            if self.__load_cache(cache_key):
+                return self.unique_events
+
+        # preprocess every log file into a partial event table and merge them in the order of the files.
+        # several log files are preprocessed in parallel per file, a single log file in parallel per line.
+        # the readers are sent to the processes instead of the paths, so a compressed log file is not decompressed
+        # again and an uncompressed log file is only memory-mapped again.
+        if self.log_files:
+            worker = copy(self)
+            worker.logs = []
+            partials = WorkerPool.imap(worker, self.logs.readers, len(self.log_files), 1)
+        else:
+            partials = [self.__get_partial_events(self.logs)]
+        unique_events_list = self.__merge_partial_events(partials)
 
         # refine unique events to remove repetitive words
         if self.refine_unique_events:
@@ -143,12 +375,27 @@ class ParallelPreprocess(object):
                     [y for x, y in enumerate(attr['preprocessed_event']) if x not in true_status]
                 attr['preprocessed_event'] = ' '.join(attr['preprocessed_event'])
                 attr['preprocessed_events_graphedge'] = attr['preprocessed_event']
+                if self.token_ids:
+                    attr['preprocessed_event_ids'] = \
+                        array('i', [y for x, y in enumerate(attr['preprocessed_event_ids']) if x not in true_status])
+
+        # token ids of graph edge events, the same array is shared when they are equal to the events
+        if self.token_ids:
+            for index, attr in self.event_attributes.iteritems():
+                if attr['preprocessed_events_graphedge'] == attr['preprocessed_event']:
+                    attr['preprocessed_events_graphedge_ids'] = attr['preprocessed_event_ids']
+                else:
+                    attr['preprocessed_events_graphedge_ids'] = \
+                        self.vocabulary.get_ids(attr['preprocessed_events_graphedge'])
 
         # get unique events for networkx
-        self.unique_events_length = unique_event_id
+        self.unique_events_length = len(self.event_attributes)
         for index, attr in self.event_attributes.iteritems():
             self.unique_events.append((index, attr))
 
+        if cache_key:
+            self.__save_cache(cache_key)
+
         return self.unique_events
 
     def get_unique_events_nopreprocess(self):
@@ -204,11 +451,20 @@ class ParallelPreprocess(object):
                     refined_graphedge = [y for x, y in enumerate(graphedge.split()) if x not in true_status]
                     properties['preprocessed_events_graphedge'] = ' '.join(refined_graphedge)
                     graph.node[index]['preprocessed_events_graphedge'] = ' '.join(refined_graphedge)
+                    if 'preprocessed_events_graphedge_ids' in properties:
+                        graphedge_ids = properties['preprocessed_events_graphedge_ids']
+                        refined_ids = array('i', [y for x, y in enumerate(graphedge_ids) if x not in true_status])
+                        properties['preprocessed_events_graphedge_ids'] = refined_ids
+                        graph.node[index]['preprocessed_events_graphedge_ids'] = refined_ids
 
                 # remove repetitive words
                 for index, properties in event_attributes_subgraph.iteritems():
                     graphedge = properties['preprocessed_events_graphedge']
                     refined_graphedge = [y for x, y in enumerate(graphedge.split()) if x not in true_status]
                     properties['preprocessed_events_graphedge'] = ' '.join(refined_graphedge)
+                    if 'preprocessed_events_graphedge_ids' in properties:
+                        graphedge_ids = properties['preprocessed_events_graphedge_ids']
+                        properties['preprocessed_events_graphedge_ids'] = \
+                            array('i', [y for x, y in enumerate(graphedge_ids) if x not in true_status])
 
         return unique_events_subgraph, event_attributes_subgraph, graph
@@ -0,0 +1,143 @@
+import cPickle
+import errno
+import hashlib
+import os
+import tempfile
+
+
+class PreprocessCache(object):
+    """An on-disk cache of preprocessing results.
+
+    An entry is keyed by a SHA-1 hash of the log file content and the preprocessing options, so a renamed or
+    copied file is still found and a modified file is never served from an old entry. The result is stored as a
+    binary pickle (highest protocol) in a single file per entry. When the total size of the cache directory
+    exceeds `max_size`, the least recently used entries are removed.
+    """
+    version = 1
+    extension = '.pkl'
+    block_size = 1 << 20
+
+    def __init__(self, cache_dir, max_size=1 << 30):
+        """The constructor of class PreprocessCache.
+
+        Parameters
+        ----------
+        cache_dir   : str
+            Directory to store cache entries. It is created if it does not exist.
+        max_size    : int
+            Maximum total size of the cache entries in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        try:
+            os.makedirs(cache_dir)
+        except OSError as exception:
+            if exception.errno != errno.EEXIST:
+                raise
+
+    def get_key(self, log_file, options):
+        """Get the cache key of a log file or several log files and the preprocessing options.
+
+        Parameters
+        ----------
+        log_file    : str or list[str]
+            Path of a log file or paths of log files in the order of concatenation.
+        options     : dict
+            Preprocessing options which change the result.
+
+        Returns
+        -------
+        key         : str
+            Hexadecimal digest of the file content and the options.
+        """
+        digest = hashlib.sha1()
+        log_files = log_file if isinstance(log_file, (list, tuple)) else [log_file]
+        for index, log_file in enumerate(log_files):
+            # separate the files, so moving lines between files gives another key
+            if index:
+                digest.update('\0%d\0' % index)
+            with open(log_file, 'rb') as f:
+                block = f.read(self.block_size)
+                while block:
+                    digest.update(block)
+                    block = f.read(self.block_size)
+
+        digest.update(repr((self.version, sorted(options.items()))))
+        key = digest.hexdigest()
+        return key
+
+    def __get_path(self, key):
+        return os.path.join(self.cache_dir, key + self.extension)
+
+    def load(self, key):
+        """Load a cache entry.
+
+        Parameters
+        ----------
+        key     : str
+            The cache key.
+
+        Returns
+        -------
+        result  : object
+            The cached result or None if the entry does not exist or cannot be read.
+        """
+        path = self.__get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = cPickle.load(f)
+        except (IOError, EOFError, cPickle.UnpicklingError):
+            return None
+
+        # mark the entry as recently used for eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return result
+
+    def save(self, key, result):
+        """Save a cache entry and evict old entries if the cache is larger than `max_size`.
+
+        The entry is written to a temporary file first and renamed, so a concurrent reader never sees a partial
+        entry.
+
+        Parameters
+        ----------
+        key     : str
+            The cache key.
+        result  : object
+            A picklable preprocessing result.
+        """
+        descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as f:
+            cPickle.dump(result, f, cPickle.HIGHEST_PROTOCOL)
+        os.rename(temp_path, self.__get_path(key))
+
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is not larger than `max_size`.
+        """
+        entries = []
+        total_size = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(self.extension):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            entries.append((status.st_mtime, status.st_size, path))
+            total_size += status.st_size
+
+        for mtime, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
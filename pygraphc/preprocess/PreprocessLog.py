@@ -1,8 +1,16 @@
-from nltk import corpus
+from array import array
 from collections import Counter
-from math import log, pow, sqrt
-from re import sub
+from math import log, pow, sqrt, ceil
+import os
+from pygraphc.preprocess.EventRecord import EventRecord
+from pygraphc.preprocess.IdfModel import IdfModel
+from pygraphc.preprocess.LogColumns import LogColumns
 from pygraphc.preprocess.LogGrammar import LogGrammar
+from pygraphc.preprocess.LogReader import LogReader
+from pygraphc.preprocess.TextNormalizer import TextNormalizer
+from pygraphc.preprocess.TimestampParser import TimestampParser
+from pygraphc.preprocess.Vocabulary import Vocabulary
+from pygraphc.preprocess.WorkerPool import WorkerPool
 
 
 class PreprocessLog(object):
@@ -18,18 +26,42 @@ class PreprocessLog(object):
                       https://intellij-support.jetbrains.com/hc/en-us/community/posts/205973504-Pycharm-type-hinting-for-list-warning
                       https://youtrack.jetbrains.com/issue/PY-22291
     """
-    def __init__(self, logtype, logfile=None):
+    def __init__(self, logtype, logfile=None, substring_df=False, jobs=1, refresh_lines=10000, year=None,
+                 idf_model=None, token_ids=False):
         """Constructor of class PreprocessLog.
 
         Parameters
         ----------
-        logtype : str
+        logtype         : str
             Type of event log.
-        logfile : str
+        logfile         : str
             Name of a log file
+        substring_df    : bool
+            Count document frequency by substring test instead of exact word matching. The exact word matching uses
+            an index built in a single pass, while the substring test reproduces the numbers of earlier versions.
+        jobs            : int
+            Number of processes to parse logs and calculate tf-idf in `preprocess` and `preprocess_text`.
+            The logs are split into `jobs` line-range chunks for the shared `WorkerPool`, so at most `jobs`
+            processes work at once, and the results are always ordered by line id.
+        refresh_lines   : int
+            Number of appended lines after which `update` recalculates tf-idf of all unique events with the current
+            document frequency. 0 disables the refresh.
+        year            : int or str
+            Year of the first log line for a log type without year. If it is not given, the year is inferred from
+            the modification time of the log file. See `TimestampParser`.
+        idf_model       : IdfModel
+            A fitted inverse document frequency model, e.g., from `fit_idf` on a reference corpus. If it is given,
+            tf-idf is weighted by the model and the document frequency of the processed logs is not counted.
+        token_ids       : bool
+            Also keep every unique event in `preprocessed_event_ids` and every log line in `preprocessed_logs_ids`
+            as an array of ids in `vocabulary`, e.g., for the evaluation indices. The tf-idf of every event is kept
+            in `tfidf_ids` and `tfidf_weights` as well, e.g., for `CreateGraph` and `StringSimilarity`.
         """
         self.logtype = logtype
         self.logfile = logfile
+        self.substring_df = substring_df
+        self.jobs = jobs
+        self.normalizer = TextNormalizer()
         self.logs = []
         self.loglength = 0
         self.events_list = []
@@ -37,125 +69,417 @@ class PreprocessLog(object):
         self.word_count = {}
         self.events_text = []
         self.preprocessed_logs = {}
+        self.preprocessed_logs_ids = {}
+        self.vocabulary = Vocabulary()
+        self.refresh_lines = refresh_lines
+        self.offset = 0
+        self.lines_since_refresh = 0
+        self.events_index = {}
+        self.year = year
+        self.timestamps = array('l')
+        self.timestamp_parser = None
+        self.idf_model = idf_model
+        self.token_ids = token_ids
+        self.columns = LogColumns()
+
+    def __call__(self, chunk):
+        # main method called when running in multiprocessing
+        task, lines = chunk
+        if task == 'parse':
+            return self.__parse_chunk(lines)
+        elif task == 'tfidf':
+            return self.__get_tfidf_chunk(lines)
+
+    def __parse_chunk(self, lines):
+        """Parse a chunk of log lines and count document frequency of words in the chunk.
 
-    def preprocess(self):
-        self.__read_log()
-        grammar = LogGrammar(self.logtype)
+        Parameters
+        ----------
+        lines   : list[str]
+            A chunk of log lines.
 
+        Returns
+        -------
+        parsed_log  : list[dict]
+            Parsed log lines with lower case message.
+        word_count  : collections.Counter
+            Document frequency of words in the chunk. It is empty when `substring_df` or `idf_model` is set.
+        """
+        grammar = LogGrammar(self.logtype)
+        parser = grammar.get_parser()
         parsed_log = []
-        """:type: list[dict]"""
-        logs_lower = []     #
-        for line in self.logs:
-            if self.logtype == 'auth':
-                parsed = grammar.parse_authlog(line)
-            elif self.logtype == 'kippo':
-                parsed = grammar.parse_kipplog(line)
+        word_count = Counter()
+        for line in lines:
+            parsed = parser(line)
+            if self.logtype == 'kippo':
                 parsed['timestamp'] = parsed['timestamp'][:-5]
-            elif self.logtype == 'syslog':
-                parsed = grammar.parse_syslog(line)
-            elif self.logtype == 'bluegene-logs':
-                parsed = grammar.parse_bluegenelog(line)
-            elif self.logtype == 'raslog':
-                parsed = grammar.parse_raslog(line)
-            elif self.logtype == 'vpnlog':
-                parsed = grammar.parse_vpnlog(line)
-            elif self.logtype == 'snort_secrepo':
-                parsed = grammar.parse_snort_secrepo(line)
-            elif self.logtype == 'snort_sotm34':
-                parsed = grammar.parse_snort_sotm34(line)
-            elif self.logtype == 'httpd_error_chuvakin':
-                parsed = grammar.parse_httpd_error_chuvakin(line)
 
             parsed['message'] = parsed['message'].lower()
-            logs_lower.append(parsed['message'])
             parsed_log.append(parsed)
+            if not self.substring_df and self.idf_model is None:
+                word_count.update(set(self.__get_words(parsed['message'])))
+
+        return parsed_log, word_count
+
+    def __get_tfidf_chunk(self, docs):
+        """Calculate tf-idf and document length for a chunk of log messages.
+
+        Parameters
+        ----------
+        docs    : list[str]
+            A chunk of lower case log messages.
+
+        Returns
+        -------
+        events  : list[tuple]
+            List of tuple where a tuple consists of preprocessed event, tf-idf, and document length.
+        """
+        events = []
+        for doc in docs:
+            preprocessed_event, tfidf = self.get_tfidf(doc, self.loglength, docs)
+            events.append((preprocessed_event, tfidf, self.get_doclength(tfidf)))
+
+        return events
+
+    def __run_chunks(self, task, lines):
+        """Run a task on `jobs` line-range chunks with the shared pool.
+
+        One chunk is sent to a process at once, so the number of chunks limits the parallelism without creating a
+        pool of `jobs` processes. The chunks are contiguous and `imap` keeps their order, so the concatenated
+        results are ordered by line id and do not depend on the number of processes.
+
+        Parameters
+        ----------
+        task    : str
+            Name of the task, i.e., parse or tfidf.
+        lines   : list
+            Log lines or log messages to be processed.
+
+        Returns
+        -------
+        results : list
+            Result of each chunk in the order of line id.
+        """
+        chunk_size = max(1, int(ceil(len(lines) / float(self.jobs))))
+        chunks = [(task, lines[index:index + chunk_size]) for index in xrange(0, len(lines), chunk_size)]
+
+        # a lightweight copy without the logs is sent to every process
+        worker = PreprocessLog(self.logtype, substring_df=self.substring_df, idf_model=self.idf_model)
+        worker.normalizer = self.normalizer
+        worker.word_count = self.word_count
+        worker.loglength = self.loglength
+
+        results = list(WorkerPool.imap(worker, chunks, len(chunks), chunksize=1))
+
+        return results
+
+    def __parse_logs(self, logs):
+        """Parse all logs and build the document frequency index.
+
+        Parameters
+        ----------
+        logs    : list[str]
+            All logs in a file.
+
+        Returns
+        -------
+        parsed_log  : list[dict]
+            Parsed log lines with lower case message.
+        """
+        parsed_log, word_count = self.__parse_lines(logs)
+        self.word_count = dict(word_count)
+        return parsed_log
+
+    def __parse_lines(self, logs):
+        """Parse log lines with `jobs` processes and count document frequency of words in the lines.
+
+        Parameters
+        ----------
+        logs    : list[str]
+            Log lines.
+
+        Returns
+        -------
+        parsed_log  : list[dict]
+            Parsed log lines with lower case message.
+        word_count  : collections.Counter
+            Document frequency of words in the lines.
+        """
+        if self.jobs > 1 and len(logs) > 1:
+            parsed_log = []
+            word_count = Counter()
+            for parsed_chunk, word_count_chunk in self.__run_chunks('parse', logs):
+                parsed_log.extend(parsed_chunk)
+                word_count.update(word_count_chunk)
+        else:
+            parsed_log, word_count = self.__parse_chunk(logs)
+
+        return parsed_log, word_count
+
+    def __get_events_tfidf(self, logs_lower):
+        """Calculate tf-idf of all log messages.
+
+        Parameters
+        ----------
+        logs_lower  : list[str]
+            All lower case log messages.
+
+        Returns
+        -------
+        events      : list[tuple]
+            List of tuple where a tuple consists of preprocessed event, tf-idf, and document length.
+        """
+        # substring document frequency needs all logs in every process, so it is always run serially
+        if self.jobs > 1 and len(logs_lower) > 1 and not self.substring_df:
+            events = []
+            for events_chunk in self.__run_chunks('tfidf', logs_lower):
+                events.extend(events_chunk)
+        else:
+            events = []
+            for doc in logs_lower:
+                preprocessed_event, tfidf = self.get_tfidf(doc, self.loglength, logs_lower)
+                events.append((preprocessed_event, tfidf, self.get_doclength(tfidf)))
+
+        return events
+
+    def fit_idf(self, idf_model=None):
+        """Count document frequency of words in the log file for an inverse document frequency model.
+
+        Only the log lines are parsed, without tf-idf and unique events. The words are counted by exact matching
+        like in `preprocess`. Call it on every file of a reference corpus with the same model, save the model with
+        `IdfModel.save`, and give the loaded model to `PreprocessLog` to skip counting document frequency.
+
+        Parameters
+        ----------
+        idf_model   : IdfModel
+            A model to add the document frequency of this file to. A new model is created if it is not given.
+
+        Returns
+        -------
+        idf_model   : IdfModel
+            The model with the document frequency of this file.
+        """
+        if self.idf_model is not None:
+            raise ValueError('Document frequency is not counted when idf_model is set.')
+
+        self.__read_log()
+        substring_df, self.substring_df = self.substring_df, False
+        try:
+            parsed_log, word_count = self.__parse_lines(self.logs)
+        finally:
+            self.substring_df = substring_df
+
+        if idf_model is None:
+            idf_model = IdfModel()
+        idf_model.update(word_count, len(parsed_log))
+        return idf_model
+
+    def preprocess(self):
+        self.__read_log()
+        parsed_log = self.__parse_logs(self.logs)
+        """:type: list[dict]"""
+        logs_lower = [parsed['message'] for parsed in parsed_log]
+        events_tfidf = self.__get_events_tfidf(logs_lower)
+        timestamp_parser = self.__get_timestamp_parser(self.logtype)
+        self.timestamps = array('l')
+        self.columns = LogColumns()
 
         # preprocess logs, add to ordinary list and unique list
         events_list = []
         events_unique = []  # type: list[tuple[int, dict]]
+        events_index = {}   # key: preprocessed event, value: unique event id
         index, index_log = 0, 0
-        for l in parsed_log:
+        for l, (preprocessed_event, tfidf, length) in zip(parsed_log, events_tfidf):
             events_list.append(l['message'])
-            preprocessed_event, tfidf = self.get_tfidf(l['message'], self.loglength, logs_lower)
+            epoch = timestamp_parser.get_epoch(l['timestamp'])
+            self.timestamps.append(epoch)
+            self.columns.add(l)
             self.preprocessed_logs[index_log] = preprocessed_event
-            check_events_unique = [e[1]['preprocessed_event'] for e in events_unique]
 
             # if not exist, add new element
-            if preprocessed_event not in check_events_unique:
-                # if event not in check_events_unique:
-                # print index, preprocessed_event
-                length = self.get_doclength(tfidf)
-                events_unique.append((index, {'event': l['message'], 'tf-idf': tfidf, 'length': length, 'status': '',
-                                              'cluster': index, 'frequency': 1, 'member': [index_log],
-                                              'preprocessed_event': preprocessed_event}))
+            if preprocessed_event not in events_index:
+                attributes = EventRecord({'event': l['message'], 'tf-idf': tfidf, 'length': length, 'status': '',
+                                          'cluster': index, 'frequency': 1, 'member': array('I', [index_log]),
+                                          'preprocessed_event': preprocessed_event,
+                                          'start': l['timestamp'], 'end': l['timestamp']})
+                if self.token_ids:
+                    self.__set_token_ids(attributes)
+                events_unique.append((index, attributes))
+                events_index[preprocessed_event] = index
                 index += 1
 
-            # if exist, increment the frequency
+            # if exist, increment the frequency and update the last timestamp
             else:
-                for e in events_unique:
-                    if preprocessed_event == e[1]['preprocessed_event']:
-                        # if event == e[1]['event']:
-                        member = e[1]['member']
-                        member.append(index_log)
-                        e[1]['member'] = member
-                        e[1]['frequency'] += 1
-
+                attributes = events_unique[events_index[preprocessed_event]][1]
+                attributes['member'].append(index_log)
+                attributes['frequency'] += 1
+                attributes['end'] = l['timestamp']
+
+            self.__set_epoch(attributes, epoch)
+            if self.token_ids:
+                self.preprocessed_logs_ids[index_log] = attributes['preprocessed_event_ids']
             index_log += 1
 
-        # get inter-arrival time of unique event
-        timestamps = {}
-        for e in events_unique:
-            tmp_timestamp = []
-            for pars in parsed_log:
-                if e[1]['event'] in pars['message']:
-                    tmp_timestamp.append(pars['timestamp'])
-            timestamps[e[1]['event']] = tmp_timestamp
-
-        for e in events_unique:
-            for k, v in timestamps.iteritems():
-                if e[1]['event'] == k:
-                    e[1]['start'], e[1]['end'] = v[0], v[-1]
-
         self.events_list = events_list
         self.events_unique = events_unique
 
-    def preprocess_text(self, logs):
-        grammar = LogGrammar(self.logtype)
+    def __read_appended_lines(self):
+        """Read complete lines appended to the log file since the last offset.
 
-        parsed_log = []
-        """:type: list[dict]"""
-        logs_lower = []
-        for line in logs:
-            if self.logtype == 'auth':
-                parsed = grammar.parse_authlog(line)
-            elif self.logtype == 'kippo':
-                parsed = grammar.parse_kipplog(line)
-                parsed['timestamp'] = parsed['timestamp'][:-5]
-            elif self.logtype == 'syslog':
-                parsed = grammar.parse_syslog(line)
-            elif self.logtype == 'bluegene':
-                parsed = grammar.parse_bluegenelog(line)
-            elif self.logtype == 'raslog':
-                parsed = grammar.parse_raslog(line)
-            elif self.logtype == 'vpnlog':
-                parsed = grammar.parse_vpnlog(line)
+        A last line without newline is left for the next call because it may still be written. If the file is
+        smaller than the offset, it is assumed to be rotated and all states are reset to read from the beginning.
 
-            parsed['message'] = parsed['message'].lower()
-            logs_lower.append(parsed['message'])
-            parsed_log.append(parsed)
+        Returns
+        -------
+        lines   : list[str]
+            Appended log lines with their trailing newline.
+        """
+        with open(self.logfile, 'rb') as f:
+            f.seek(0, 2)
+            if f.tell() < self.offset:
+                self.__reset()
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind('\n') + 1
+        lines = data[:end].splitlines(True)
+        self.offset += end
+        return lines
+
+    def __reset(self):
+        # reset all states of incremental preprocessing
+        self.offset = 0
+        self.lines_since_refresh = 0
+        self.loglength = 0
+        self.word_count = {}
+        self.events_list = []
+        self.events_unique = []
+        self.events_index = {}
+        self.preprocessed_logs = {}
+        self.preprocessed_logs_ids = {}
+        self.vocabulary = Vocabulary()
+        self.timestamps = array('l')
+        self.timestamp_parser = None
+        self.columns = LogColumns()
+
+    def __refresh_tfidf(self):
+        """Recalculate tf-idf of all unique events with the current document frequency and number of logs.
+        """
+        for index, attributes in self.events_unique:
+            preprocessed_event, tfidf = self.get_tfidf(attributes['event'], self.loglength, [])
+            attributes['tf-idf'] = tfidf
+            attributes['length'] = self.get_doclength(tfidf)
+            if self.token_ids:
+                attributes['tfidf_ids'], attributes['tfidf_weights'] = self.vocabulary.get_tfidf_arrays(tfidf)
+
+        self.lines_since_refresh = 0
+
+    def update(self):
+        """Preprocess only the lines appended to the log file since the last call.
+
+        The byte offset, document frequency, unique events, and their timestamps are kept between calls, so the
+        cost of a call is proportional to the number of new lines. Use either `update` or `preprocess` on an
+        instance, not both. The first call reads the whole file.
+
+        The tf-idf of a new unique event is calculated with the document frequency and number of logs at the time
+        it first appears, while the tf-idf of an existing unique event is not changed by new lines. Therefore, the
+        inverse document frequency drifts as the file grows. After `refresh_lines` appended lines, tf-idf of all
+        unique events is recalculated and all of them are reported as changed. The cost of the refresh depends on
+        the number of unique events, not on the number of lines. With `idf_model`, the weights do not drift and
+        there is no refresh. `substring_df` is not supported because it needs all logs for every word.
+
+        Returns
+        -------
+        new_events      : list[int]
+            Ids of unique events which first appear in the appended lines.
+        changed_events  : list[int]
+            Ids of existing unique events with new members or a recalculated tf-idf.
+        """
+        if self.substring_df:
+            raise ValueError('Incremental preprocessing does not support substring_df.')
+
+        lines = self.__read_appended_lines()
+        if not lines:
+            return [], []
+
+        # update document frequency and number of logs. the lines of the initial read are not counted for the
+        # refresh, since their tf-idf is already calculated with the document frequency of all of them.
+        initial = self.loglength == 0
+        parsed_log, word_count = self.__parse_lines(lines)
+        for word, count in word_count.iteritems():
+            self.word_count[word] = self.word_count.get(word, 0) + count
+        self.loglength += len(lines)
+        if not initial:
+            self.lines_since_refresh += len(lines)
+
+        if self.timestamp_parser is None:
+            self.timestamp_parser = self.__get_timestamp_parser(self.logtype)
+
+        new_events, changed_events = set(), set()
+        index_log = len(self.events_list)
+        for l in parsed_log:
+            self.events_list.append(l['message'])
+            epoch = self.timestamp_parser.get_epoch(l['timestamp'])
+            self.timestamps.append(epoch)
+            self.columns.add(l)
+            preprocessed_event = ' '.join(self.__get_words(l['message']))
+
+            # add a new unique event
+            if preprocessed_event not in self.events_index:
+                index = len(self.events_unique)
+                preprocessed_event, tfidf = self.get_tfidf(l['message'], self.loglength, [])
+                attributes = EventRecord({'event': l['message'], 'tf-idf': tfidf, 'length': self.get_doclength(tfidf),
+                                          'status': '', 'cluster': index, 'frequency': 1,
+                                          'member': array('I', [index_log]), 'preprocessed_event': preprocessed_event,
+                                          'start': l['timestamp'], 'end': l['timestamp']})
+                if self.token_ids:
+                    self.__set_token_ids(attributes)
+                self.events_unique.append((index, attributes))
+                self.events_index[preprocessed_event] = index
+                new_events.add(index)
+
+            # update an existing unique event
+            else:
+                index = self.events_index[preprocessed_event]
+                attributes = self.events_unique[index][1]
+                attributes['member'].append(index_log)
+                attributes['frequency'] += 1
+                attributes['end'] = l['timestamp']
+                if index not in new_events:
+                    changed_events.add(index)
+
+            self.preprocessed_logs[index_log] = preprocessed_event
+            self.__set_epoch(attributes, epoch)
+            if self.token_ids:
+                self.preprocessed_logs_ids[index_log] = attributes['preprocessed_event_ids']
+            index_log += 1
+
+        # refresh tf-idf of all unique events to limit the drift of inverse document frequency.
+        # the weights of a fitted idf model do not drift.
+        if self.refresh_lines and self.lines_since_refresh >= self.refresh_lines and self.idf_model is None:
+            self.__refresh_tfidf()
+            changed_events = set(xrange(len(self.events_unique))) - new_events
+
+        return sorted(new_events), sorted(changed_events)
+
+    def preprocess_text(self, logs):
+        self.loglength = len(logs)
+        parsed_log = self.__parse_logs(logs)
+        """:type: list[dict]"""
+        logs_lower = [parsed['message'] for parsed in parsed_log]
+        events_tfidf = self.__get_events_tfidf(logs_lower)
+        self.columns = LogColumns()
+        for parsed in parsed_log:
+            self.columns.add(parsed)
 
         # preprocess logs, add to ordinary list and unique list
         events = {}
-        index = 0
-        log_length = len(logs)
-        for l in parsed_log:
-            preprocessed_event, tfidf = self.get_tfidf(l['message'], log_length, logs_lower)
-            length = self.get_doclength(tfidf)
+        for index, (preprocessed_event, tfidf, length) in enumerate(events_tfidf):
             events[index] = {'tf-idf': tfidf, 'length': length}
-            index += 1
+            if self.token_ids:
+                events[index]['tfidf_ids'], events[index]['tfidf_weights'] = self.vocabulary.get_tfidf_arrays(tfidf)
 
         self.events_text = events
-        self.loglength = log_length
 
     def do_preprocess(self):
         """Main method to execute preprocess log.
@@ -167,63 +491,99 @@ class PreprocessLog(object):
         logs_lower = [' '.join(l.lower().split()[5:]) for l in self.logs[:]]
         logs_total = self.loglength
 
+        # get document frequency of all words if there is no fitted idf model
+        if self.idf_model is None:
+            self.__get_doc_frequency(logs_lower)
+        timestamp_parser = self.__get_timestamp_parser('auth')
+        self.timestamps = array('l')
+
         # preprocess logs, add to ordinary list and unique list
         events_list = []
         events_unique = []  # type: list[tuple[int, dict]]
+        events_index = {}   # key: preprocessed event, value: unique event id
         index, index_log = 0, 0
         for l in logs_lower:
             auth_split = l.split()
             event_type, event_desc = auth_split[0].split('[')[0], ' '.join(auth_split[1:])
             event = event_type + ' ' + event_desc
             events_list.append(event)
+            timestamp = ' '.join(self.logs[index_log].split()[:3])
+            epoch = timestamp_parser.get_epoch(timestamp)
+            self.timestamps.append(epoch)
 
             preprocessed_event, tfidf = self.get_tfidf(event, logs_total, logs_lower)
             self.preprocessed_logs[index_log] = preprocessed_event
-            check_events_unique = [e[1]['preprocessed_event'] for e in events_unique]
-            # check_events_unique = [e[1]['event'] for e in events_unique]
 
             # if not exist, add new element
-            if preprocessed_event not in check_events_unique:
-                # if event not in check_events_unique:
-                # print index, preprocessed_event
+            if preprocessed_event not in events_index:
                 length = self.get_doclength(tfidf)
-                events_unique.append((index, {'event': event, 'tf-idf': tfidf, 'length': length, 'status': '',
-                                              'cluster': index, 'frequency': 1, 'member': [index_log],
-                                              'preprocessed_event': preprocessed_event}))
+                attributes = EventRecord({'event': event, 'tf-idf': tfidf, 'length': length, 'status': '',
+                                          'cluster': index, 'frequency': 1, 'member': array('I', [index_log]),
+                                          'preprocessed_event': preprocessed_event,
+                                          'start': timestamp, 'end': timestamp})
+                if self.token_ids:
+                    self.__set_token_ids(attributes)
+                events_unique.append((index, attributes))
+                events_index[preprocessed_event] = index
                 index += 1
 
-            # if exist, increment the frequency
+            # if exist, increment the frequency and update the last timestamp
             else:
-                for e in events_unique:
-                    if preprocessed_event == e[1]['preprocessed_event']:
-                        # if event == e[1]['event']:
-                        member = e[1]['member']
-                        member.append(index_log)
-                        e[1]['member'] = member
-                        e[1]['frequency'] += 1
-
+                attributes = events_unique[events_index[preprocessed_event]][1]
+                attributes['member'].append(index_log)
+                attributes['frequency'] += 1
+                attributes['end'] = timestamp
+
+            self.__set_epoch(attributes, epoch)
+            if self.token_ids:
+                self.preprocessed_logs_ids[index_log] = attributes['preprocessed_event_ids']
             index_log += 1
 
-        # get inter-arrival time of unique event
-        timestamps = {}
-        for e in events_unique:
-            timestamps[e[1]['event']] = [' '.join(l.split()[:3]) for l in self.logs
-                                         if e[1]['event'] in ' '.join(l.lower().split())]
-
-        for e in events_unique:
-            for k, v in timestamps.iteritems():
-                if e[1]['event'] == k:
-                    e[1]['start'], e[1]['end'] = v[0], v[-1]
-
         self.events_list = events_list
         self.events_unique = events_unique
 
-    def __read_log(self):
-        """Read a log file.
+    def __get_timestamp_parser(self, logtype):
+        # the modification time of the log file is the reference to infer the year
+        reference = os.path.getmtime(self.logfile) if self.logfile else None
+        timestamp_parser = TimestampParser(logtype, self.year, reference)
+        return timestamp_parser
+
+    @staticmethod
+    def __set_epoch(attributes, epoch):
+        """Keep the earliest and the latest epoch of a unique event in `start_epoch` and `end_epoch`.
+
+        Parameters
+        ----------
+        attributes  : dict
+            Attributes of a unique event.
+        epoch       : int
+            Epoch of a member log line. -1 (an unparsed timestamp) does not change the attributes.
         """
-        with open(self.logfile, 'r') as f:
-            logs = f.readlines()
+        start, end = attributes.get('start_epoch', -1), attributes.get('end_epoch', -1)
+        if epoch >= 0:
+            start = epoch if start < 0 else min(start, epoch)
+            end = max(end, epoch)
+        attributes['start_epoch'], attributes['end_epoch'] = start, end
+
+    def __set_token_ids(self, attributes):
+        """Add the token ids of a unique event and its tf-idf as parallel arrays.
 
+        The preprocessed event becomes `preprocessed_event_ids` and the tf-idf list becomes `tfidf_ids` and
+        `tfidf_weights`, where the weight of `tfidf_ids[i]` is `tfidf_weights[i]`. The ids are taken from
+        `self.vocabulary`.
+
+        Parameters
+        ----------
+        attributes  : dict
+            Attributes of a unique event with `preprocessed_event` and `tf-idf`.
+        """
+        attributes['preprocessed_event_ids'] = self.vocabulary.get_ids(attributes['preprocessed_event'])
+        attributes['tfidf_ids'], attributes['tfidf_weights'] = self.vocabulary.get_tfidf_arrays(attributes['tf-idf'])
+
+    def __read_log(self):
+        """Read a log file. The lines are memory-mapped and read lazily by line id.
+        """
+        logs = LogReader(self.logfile)
         self.logs = logs
         self.loglength = len(logs)
 
@@ -255,9 +615,9 @@ class PreprocessLog(object):
         count = 0
 
         # if word exist in dictionary
-        if word in self.word_count.keys():
+        if word in self.word_count:
             count = self.word_count[word]
-        else:
+        elif self.substring_df:
             for doc in docs:
                 if word in doc:
                     count += 1
@@ -266,6 +626,49 @@ class PreprocessLog(object):
         count = float(count)
         return count
 
+    def __get_words(self, doc):
+        """Remove number, additional stopwords, and word with length only 1 character from a log line.
+
+        Parameters
+        ----------
+        doc     : str
+            A single event log line.
+
+        Returns
+        -------
+        words   : list[str]
+            List of remaining words in the log line.
+        """
+        doc = self.normalizer.get_alphabet(doc, ' ')
+        additional_stopwords = ['preauth', 'from', 'xxxxx', 'for', 'port', 'sshd', 'ssh', 'root']
+        for a in additional_stopwords:
+            doc = doc.replace(a, '')
+        doc = doc.replace('_', ' ')
+
+        words = [word for word in doc.split() if len(word) > 1]
+        return words
+
+    def __get_doc_frequency(self, docs):
+        """Build the document frequency index of all words in a single pass.
+
+        Each log line is tokenized once and every distinct word in the line increments its count. Therefore,
+        a word is counted by exact matching, not as a substring of another word. If `substring_df` is set,
+        the index is left empty and filled lazily by substring test in `__get_word_in_docs`.
+
+        Parameters
+        ----------
+        docs    : list[str]
+            All logs in a file.
+        """
+        self.word_count = {}
+        if self.substring_df:
+            return
+
+        word_count = Counter()
+        for doc in docs:
+            word_count.update(set(self.__get_words(doc)))
+        self.word_count = dict(word_count)
+
     def get_tfidf(self, doc, total_docs, docs):
         """Calculate tf-idf (term frequency-inverse document frequency).
 
@@ -274,7 +677,7 @@ class PreprocessLog(object):
         doc         : str
             A single event log line.
         total_docs  : float
-            Total number of logs or total line numbers.
+            Total number of logs or total line numbers. It is not used with `idf_model`.
         docs        : list[str]
             All logs in a file.
 
@@ -285,27 +688,15 @@ class PreprocessLog(object):
         tfidf       : list[tuple]
             List of tuple where a tuple consists of two elements: 1) word and 2) its tf-idf value.
         """
-        # remove number, stopwords
-        doc = sub('[^a-zA-Z]', ' ', doc)
-        additional_stopwords = ['preauth', 'from', 'xxxxx', 'for', 'port', 'sshd', 'ssh', 'root']
-        for a in additional_stopwords:
-            doc = doc.replace(a, '')
-        doc = doc.replace('_', ' ')
+        # remove number, stopwords, and word with length only 1 character
+        doc = ' '.join(self.__get_words(doc))
 
-        # remove word with length only 1 character
-        doc_split = doc.split()
-        # print doc, doc_split
-        for index, word in enumerate(doc_split):
-            if len(word) == 1:
-                doc_split[index] = ''
-
-        # remove more than one space
-        doc = ' '.join(doc_split)
-        doc = ' '.join(doc.split())
+        # build document frequency index if it is not available yet
+        if not self.word_count and not self.substring_df and self.idf_model is None:
+            self.__get_doc_frequency(docs)
 
         # remove stopwords
-        stopwords = corpus.stopwords.words('english')
-        stopwords_result = [w.lower() for w in doc.split() if w.lower() not in stopwords]
+        stopwords_result = self.normalizer.remove_stopwords(doc.lower().split())
 
         # count word frequency (tf)
         tf = Counter(stopwords_result)
@@ -314,11 +705,14 @@ class PreprocessLog(object):
         for t in tf.most_common():
             normalized_tf = float(t[1]) / float(words_total)    # normalized word frequency
             # wid = self.__get_wordindocs(t[0], docs)             # calculate word occurrence in all documents
-            wid = self.__get_word_in_docs(t[0], docs)
-            try:
-                idf = 1 + log(total_docs / wid)                 # calculate idf
-            except ZeroDivisionError:
-                idf = 1
+            if self.idf_model is not None:
+                idf = self.idf_model.get_idf(t[0])              # idf from the fitted model
+            else:
+                wid = self.__get_word_in_docs(t[0], docs)
+                try:
+                    idf = 1 + log(total_docs / wid)             # calculate idf
+                except ZeroDivisionError:
+                    idf = 1
             tfidf_val = normalized_tf * idf                     # calculate tf-idf
             tfidf.append((t[0], tfidf_val))
 
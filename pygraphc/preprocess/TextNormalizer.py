@@ -0,0 +1,92 @@
+from nltk import corpus
+import re
+
+
+class TextNormalizer(object):
+    """A reusable normalizer for the words of event log messages.
+
+    The stopwords are loaded from nltk only once and kept in a frozenset, so a membership test is O(1) and the
+    stopwords never grow between calls. Month and day names are taken from a fixed lexicon instead of finding
+    dates with datefinder, but they are only removed if they are part of a date, i.e., a run of month names, day
+    names, and numbers with at least one number such as `Dec 17 06:55:46`. Otherwise, they are real words such as
+    `may` or `sun`. The normalizer only holds frozensets and compiled regular expressions, so it is pickled
+    cheaply to every process in multiprocessing.
+    """
+    months = ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+              'november', 'december', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct',
+              'nov', 'dec')
+    days = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+            'mon', 'tue', 'tues', 'wed', 'thu', 'thur', 'thurs', 'fri', 'sat', 'sun')
+
+    def __init__(self):
+        """The constructor of class TextNormalizer.
+        """
+        self.stopwords = frozenset(corpus.stopwords.words('english'))
+        self.datewords = frozenset(self.months + self.days)
+        self.nonalphabet = re.compile('[^a-zA-Z]')
+        self.datenumber = re.compile('^[^a-zA-Z]*[0-9][^a-zA-Z]*$')
+
+    def get_alphabet(self, text, replacement=''):
+        """Replace every non-alphabet character in a text.
+
+        Parameters
+        ----------
+        text        : str
+            A text to be normalized, e.g., a log line or a single word.
+        replacement : str
+            Replacement for non-alphabet characters.
+
+        Returns
+        -------
+        text        : str
+            Text with alphabet characters only, except the replacement.
+        """
+        return self.nonalphabet.sub(replacement, text)
+
+    def get_datewords(self, words):
+        """Get month and day names which are part of a date.
+
+        A date is a run of adjacent words which are either month or day names or numbers, e.g., a day, a year, or
+        a time, and it contains at least one number.
+
+        Parameters
+        ----------
+        words       : list[str]
+            List of lower case words of a log line before removing non-alphabet characters.
+
+        Returns
+        -------
+        datewords   : frozenset
+            Alphabet-only month and day names found in dates.
+        """
+        datewords, run, has_number = set(), [], False
+        for word in words + ['']:
+            alphabet = self.get_alphabet(word)
+            if alphabet in self.datewords:
+                run.append(alphabet)
+            elif self.datenumber.match(word):
+                has_number = True
+            else:
+                if has_number:
+                    datewords.update(run)
+                run, has_number = [], False
+
+        return frozenset(datewords)
+
+    def remove_stopwords(self, words, datewords=None):
+        """Remove stopwords from a list of lower case words.
+
+        Parameters
+        ----------
+        words       : list[str]
+            List of lower case words.
+        datewords   : frozenset
+            Month and day names to be removed as well, e.g., from `get_datewords`.
+
+        Returns
+        -------
+        words       : list[str]
+            List of words without stopwords.
+        """
+        stopwords = self.stopwords | datewords if datewords else self.stopwords
+        return [word for word in words if word not in stopwords]
@@ -0,0 +1,130 @@
+from calendar import timegm
+from datetime import datetime
+from time import time
+from pygraphc.preprocess.LogGrammar import LogGrammar
+
+
+class TimestampParser(object):
+    """Convert timestamps of a log type to epoch seconds.
+
+    Many log types do not write the year. If `year` is given, it is the year of the first timestamp and the year
+    is incremented whenever the month goes back by more than six months, e.g., from Dec to Jan, so the timestamps
+    must be given in the order of the log lines. Otherwise, the year is inferred from `reference`, usually the
+    modification time of the log file: a timestamp is in the year of the reference unless it would be later than
+    the reference, then it is in the previous year. With `fixed_year`, every timestamp is parsed in `year`, e.g.,
+    for timestamps which are not in the order of the log lines. Timestamps are treated as UTC, and a timestamp which
+    cannot be parsed gets -1.
+    """
+    formats = {
+        'auth': '%b %d %H:%M:%S',
+        'syslog': '%b %d %H:%M:%S',
+        'messages_casper_rw': '%b %d %H:%M:%S',
+        'snort_sotm34': '%b %d %H:%M:%S',
+        'snort_secrepo': '%m/%d-%H:%M:%S.%f',
+        'kippo': '%Y-%m-%d %H:%M:%S',
+        'bluegene': '%Y-%m-%d-%H.%M.%S.%f',
+        'raslog': '%Y-%m-%d-%H.%M.%S.%f',
+        'vpnlog': '%a %b %d %H:%M:%S %Y',
+        'httpd_error_chuvakin': '[%a %b %d %H:%M:%S %Y]'
+    }
+    cache_size = 100000
+
+    def __init__(self, logtype, year=None, reference=None, fixed_year=False):
+        """The constructor of class TimestampParser.
+
+        Parameters
+        ----------
+        logtype     : str
+            Type of event log.
+        year        : int or str
+            Year of the first log line for a log type without year.
+        reference   : float
+            Epoch time which is not earlier than the last log line, e.g., the modification time of the log file.
+            The current time is used if it is not given.
+        fixed_year  : bool
+            Parse every timestamp in `year` without moving to the next year.
+        """
+        self.logtype = logtype
+        self.format = self.formats.get(LogGrammar.aliases.get(logtype, logtype))
+        self.has_year = self.format is not None and '%Y' in self.format
+        self.year = int(year) if year else None
+        self.fixed_year = fixed_year and self.year is not None
+        self.reference = int(reference if reference is not None else time())
+        self.last_month = None
+        self.__cache = {}
+
+    def __parse(self, timestamp, year):
+        # parse a timestamp with the given year if the log type does not have one
+        if self.has_year:
+            parsed = datetime.strptime(timestamp, self.format)
+        else:
+            parsed = datetime.strptime(str(year) + ' ' + timestamp, '%Y ' + self.format)
+        return parsed
+
+    def __get_inferred(self, timestamp):
+        # infer the year from the reference time
+        year = datetime.utcfromtimestamp(self.reference).year
+        parsed = self.__parse(timestamp, year)
+        epoch = timegm(parsed.utctimetuple())
+        if epoch > self.reference + 86400:
+            parsed = self.__parse(timestamp, year - 1)
+            epoch = timegm(parsed.utctimetuple())
+
+        return epoch
+
+    def __get_rolled_over(self, timestamp):
+        # move to the next year when the month goes back, e.g., from Dec to Jan
+        parsed = self.__parse(timestamp, self.year)
+        if self.last_month is not None and self.last_month - parsed.month > 6:
+            self.year += 1
+            parsed = self.__parse(timestamp, self.year)
+        self.last_month = parsed.month
+
+        epoch = timegm(parsed.utctimetuple())
+        return epoch
+
+    def get_epoch(self, timestamp):
+        """Convert a timestamp to epoch seconds.
+
+        Parameters
+        ----------
+        timestamp   : str
+            A timestamp string as parsed by `LogGrammar`.
+
+        Returns
+        -------
+        epoch       : int
+            Epoch seconds of the timestamp or -1 if it cannot be parsed.
+        """
+        if self.format is None or not timestamp:
+            return -1
+
+        # timestamps of nearby lines are often equal, so they are parsed only once
+        rolled_over = self.year is not None and not self.has_year and not self.fixed_year
+        key = (self.year, timestamp)
+        if key in self.__cache:
+            epoch, month = self.__cache[key]
+            if not rolled_over:
+                return epoch
+            elif self.last_month is None or self.last_month - month <= 6:
+                self.last_month = month
+                return epoch
+
+        try:
+            if self.has_year:
+                parsed = self.__parse(timestamp, None)
+                epoch, month = timegm(parsed.utctimetuple()), parsed.month
+            elif rolled_over:
+                epoch = self.__get_rolled_over(timestamp)
+                month = self.last_month
+            elif self.fixed_year:
+                epoch, month = timegm(self.__parse(timestamp, self.year).utctimetuple()), None
+            else:
+                epoch, month = self.__get_inferred(timestamp), None
+        except ValueError:
+            return -1
+
+        if len(self.__cache) >= self.cache_size:
+            self.__cache.clear()
+        self.__cache[(self.year, timestamp)] = (epoch, month)
+        return epoch
@@ -0,0 +1,80 @@
+import re
+
+
+class TokenMasker(object):
+    """Replace variable tokens in log messages with typed placeholders.
+
+    Tokens such as IP addresses, hexadecimal ids, paths, and numbers differ between lines of the same event type.
+    All patterns are combined into a single precompiled regular expression with a named group per pattern, so a
+    message is scanned once and every match is replaced by the placeholder of its type. The placeholders only
+    consist of letters and are separated by spaces, so they survive the alphabet-only normalization of
+    `ParallelPreprocess` as separate words. A number is only masked as a whole token, e.g., not the pid in
+    `sshd[1234]:`. User-defined patterns are tried before the default ones, e.g.,
+    `TokenMasker([('user', r'(?<=user )[a-z_][\w.-]*')])` replaces the word after "user" with "maskuser". The
+    patterns are matched on lower case messages.
+    """
+    default_patterns = (
+        ('ip', r'(?<![\w.:])(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?(?![\w.])'),
+        ('hex', r'\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{8,}\b'),
+        ('path', r'(?<![\w/])(?:/[\w.@%+-]+)+/?'),
+        ('num', r'(?<![^\s=:(])[-+]?\d+(?:\.\d+)?(?=[\s,;)]|$)')
+    )
+    placeholder_prefix = 'mask'
+
+    def __init__(self, patterns=None, default_patterns=True):
+        """The constructor of class TokenMasker.
+
+        Parameters
+        ----------
+        patterns            : list[tuple]
+            User-defined patterns as a list of (name, regular expression). The name is a lower case word and the
+            placeholder is `mask` + name.
+        default_patterns    : bool
+            Use the default patterns for IP addresses, hexadecimal ids, paths, and numbers after the user-defined
+            patterns.
+        """
+        self.patterns = list(patterns) if patterns else []
+        if default_patterns:
+            self.patterns.extend(self.default_patterns)
+
+        self.placeholders = {}
+        groups = []
+        for name, pattern in self.patterns:
+            if not re.match('^[a-z]+$', name) or name in self.placeholders:
+                raise ValueError('Pattern name must be a unique lower case word: %r' % name)
+            self.placeholders[name] = ' ' + self.placeholder_prefix + name + ' '
+            groups.append('(?P<%s>%s)' % (name, pattern))
+
+        self.regex = re.compile('|'.join(groups)) if groups else None
+
+    def __replace(self, matched):
+        # replace a match with the placeholder of its pattern
+        return self.placeholders[matched.lastgroup]
+
+    def mask(self, message):
+        """Replace variable tokens in a message.
+
+        Parameters
+        ----------
+        message : str
+            A lower case log message.
+
+        Returns
+        -------
+        message : str
+            The message with placeholders.
+        """
+        if self.regex is None:
+            return message
+
+        return self.regex.sub(self.__replace, message)
+
+    def get_key(self):
+        """Get the names and patterns to identify the masking, e.g., in a cache key.
+
+        Returns
+        -------
+        key     : tuple
+            Pairs of name and regular expression in the order they are tried.
+        """
+        return tuple(self.patterns)
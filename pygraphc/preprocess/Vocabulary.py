@@ -0,0 +1,96 @@
+from array import array
+
+
+class Vocabulary(object):
+    """A global vocabulary which maps every word of preprocessed events to an integer id.
+
+    An event is stored as an `array('i')` of token ids instead of a space-joined string, so similarity and
+    evaluation code can compare integers without splitting and hashing the same strings again. The ids are
+    given in the order the words are first seen, so the same logs always give the same ids.
+    """
+    typecode = 'i'
+
+    def __init__(self):
+        """The constructor of class Vocabulary.
+        """
+        self.word_ids = {}
+        self.words = []
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.word_ids
+
+    def get_id(self, word):
+        """Get the id of a word. A new id is added for an unseen word.
+
+        Parameters
+        ----------
+        word    : str
+            A word in a preprocessed event.
+
+        Returns
+        -------
+        word_id : int
+            The id of the word.
+        """
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.words)
+            self.word_ids[word] = word_id
+            self.words.append(word)
+
+        return word_id
+
+    def get_ids(self, words):
+        """Convert words to token ids.
+
+        Parameters
+        ----------
+        words   : list[str] or str
+            List of words or a space-joined preprocessed event.
+
+        Returns
+        -------
+        ids     : array.array
+            Token ids of the words in the same order.
+        """
+        if isinstance(words, basestring):
+            words = words.split()
+
+        return array(self.typecode, [self.get_id(word) for word in words])
+
+    def get_words(self, ids):
+        """Convert token ids back to words.
+
+        Parameters
+        ----------
+        ids     : array.array or list[int]
+            Token ids.
+
+        Returns
+        -------
+        words   : list[str]
+            Words of the token ids in the same order.
+        """
+        return [self.words[word_id] for word_id in ids]
+
+    def get_tfidf_arrays(self, tfidf):
+        """Convert a tf-idf list to parallel arrays of token ids and weights.
+
+        Parameters
+        ----------
+        tfidf   : list[tuple]
+            List of tuple where a tuple consists of a word and its tf-idf value.
+
+        Returns
+        -------
+        ids     : array.array
+            Token ids of the words.
+        weights : array.array
+            tf-idf value of each token id in the same position.
+        """
+        ids = array(self.typecode, [self.get_id(word) for word, _ in tfidf])
+        weights = array('d', [weight for _, weight in tfidf])
+        return ids, weights
@@ -0,0 +1,97 @@
+import atexit
+import multiprocessing
+import os
+from itertools import imap
+
+
+class WorkerPool(object):
+    """A process pool which is created lazily and reused by every parallel step in a process.
+
+    Creating a `multiprocessing.Pool` forks all workers, so creating one per call is expensive when a step runs
+    many times per file, e.g., `CreateGraphModel.create_graph_subgraph` in abstraction. The pool is kept in the
+    class with one process per CPU and created again only in a forked child process. A step which should use fewer
+    processes sends fewer chunks instead of resizing the pool, so steps with different parallelism share the same
+    workers. Tasks are sent in chunks with `imap`, so the results are streamed in order instead of collected in a list.
+    A daemonic process, i.e., a worker of another pool, cannot have children, so the tasks are run serially there.
+    """
+    pool = None
+    pid = None
+    processes = 0
+    tasks_per_process = 4
+
+    @classmethod
+    def get_pool(cls):
+        """Get the shared pool with one process per CPU.
+
+        Returns
+        -------
+        pool        : multiprocessing.pool.Pool
+            The shared pool.
+        """
+        if cls.pool is None or cls.pid != os.getpid():
+            cls.processes = multiprocessing.cpu_count()
+            cls.pool = multiprocessing.Pool(processes=cls.processes)
+            cls.pid = os.getpid()
+
+        return cls.pool
+
+    @classmethod
+    def get_chunksize(cls, total_tasks, processes=None):
+        """Get the default chunk size, so every process gets `tasks_per_process` chunks.
+
+        Parameters
+        ----------
+        total_tasks : int
+            Total number of tasks.
+        processes   : int
+            Number of processes.
+
+        Returns
+        -------
+        chunksize   : int
+            Number of tasks sent to a process at once.
+        """
+        processes = processes or multiprocessing.cpu_count()
+        chunksize = max(1, total_tasks // (processes * cls.tasks_per_process))
+        return chunksize
+
+    @classmethod
+    def imap(cls, function, tasks, total_tasks, chunksize=None):
+        """Run a function on tasks with the shared pool and stream the results in order.
+
+        Parameters
+        ----------
+        function    : callable
+            A picklable function or an object with `__call__`. It is pickled once per chunk.
+        tasks       : iterable
+            Tasks, e.g., a generator.
+        total_tasks : int
+            Total number of tasks to get the default chunk size.
+        chunksize   : int
+            Number of tasks sent to a process at once. The default is from `get_chunksize`.
+
+        Returns
+        -------
+        results     : iterator
+            Result of each task in the order of tasks.
+        """
+        if multiprocessing.current_process().daemon:
+            return imap(function, tasks)
+
+        pool = cls.get_pool()
+        chunksize = chunksize or cls.get_chunksize(total_tasks, cls.processes)
+        return pool.imap(function, tasks, chunksize)
+
+    @classmethod
+    def close(cls):
+        """Terminate the shared pool if it is created by the current process.
+        """
+        if cls.pool is not None and cls.pid == os.getpid():
+            cls.pool.terminate()
+            cls.pool.join()
+        cls.pool = None
+        cls.pid = None
+        cls.processes = 0
+
+
+atexit.register(WorkerPool.close)
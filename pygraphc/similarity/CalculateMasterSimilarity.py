@@ -6,7 +6,8 @@ import multiprocessing
 
 
 class CalculateMasterSimilarity(object):
-    def __init__(self, mode, logtype, logs, clusters, cosine_master_file=''):
+    def __init__(self, mode, logtype, logs, clusters, cosine_master_file='', idf_model=None,
+                 token_ids=False):
         self.mode = mode
         self.logtype = logtype
         self.logs = logs
@@ -14,6 +15,8 @@ class CalculateMasterSimilarity(object):
         self.cosine_master_file = cosine_master_file
         self.events = {}
         self.loglength = 0
+        self.idf_model = idf_model
+        self.token_ids = token_ids
 
     def __call__(self, source):
         return self.__write_cosine_csv(source)
@@ -25,18 +28,16 @@ class CalculateMasterSimilarity(object):
         writer = csv.writer(f)
         for src, dst in combinations(xrange(self.loglength), 2):
             if src == source:
-                similarity = StringSimilarity.get_cosine_similarity(self.events[src]['tf-idf'],
-                                                                    self.events[dst]['tf-idf'],
-                                                                    self.events[src]['length'],
-                                                                    self.events[dst]['length'])
+                similarity = StringSimilarity.get_event_similarity(self.events[src], self.events[dst])
                 if similarity > 0:
                     row = [dst, 1 - similarity]
                     writer.writerow(row)
         f.close()
 
     def calculate_master(self):
-        # preprocess event log
-        preprocess = PreprocessLog(self.logtype)
+        # preprocess event log, tf-idf is weighted by the fitted idf model if it is given.
+        # token_ids compares the tf-idf as token id arrays.
+        preprocess = PreprocessLog(self.logtype, idf_model=self.idf_model, token_ids=self.token_ids)
         preprocess.preprocess_text(self.logs)
         self.events = preprocess.events_text
         self.loglength = preprocess.loglength
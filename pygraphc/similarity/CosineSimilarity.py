@@ -1,12 +1,21 @@
 from __future__ import division
-from collections import Counter
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from itertools import combinations, izip
 from math import log, sqrt
-from itertools import combinations
 import multiprocessing
+from pygraphc.preprocess.Vocabulary import Vocabulary
+from pygraphc.preprocess.WorkerPool import WorkerPool
+from pygraphc.similarity.KNearestNeighbors import KNearestNeighbors
+from pygraphc.similarity.SharedEvents import SharedEvents
 
 
 class CosineSimilarity(object):
-    def __init__(self):
+    def __init__(self, exact_df=False):
+        # exact_df counts the document frequency of a word in the two documents of every pair. otherwise, the count
+        # of a word is cached from the first pair with the word and reused for the next pairs like earlier versions.
+        self.exact_df = exact_df
         self.string1 = ''
         self.string2 = ''
         self.docs = []
@@ -27,8 +36,8 @@ class CosineSimilarity(object):
         return count
 
     def __get_tfidf(self, string):
-        # calculate tf-idf
-        string_split = string.split()
+        # calculate tf-idf. a string is split into words, while token ids are used as they are.
+        string_split = string.split() if isinstance(string, basestring) else string
         term_frequency = Counter(string_split)          # calculate tf
         total_terms = len(string_split)
         tfidf = {}
@@ -52,11 +61,15 @@ class CosineSimilarity(object):
         return length
 
     def get_cosine_similarity(self, string1, string2):
+        # the messages are either strings or sequences of token ids, e.g., `preprocessed_events_graphedge_ids`.
+        # a word in strings is counted in a document as a substring, while a token id is counted by exact matching.
         # initialization
         self.string1 = string1
         self.string2 = string2
         self.docs = [self.string1, self.string2]
         self.total_docs = len(self.docs)
+        if self.exact_df:
+            self.word_count = {}
 
         # get tfidf fot both string
         tfidf1 = self.__get_tfidf(self.string1)
@@ -83,47 +96,153 @@ class CosineSimilarity(object):
 
 
 class ParallelCosineSimilarity(object):
-    def __init__(self, event_attributes, event_length, nodes=None):
+    def __init__(self, event_attributes, event_length, nodes=None, token_ids=False, chunksize=None, partition=None,
+                 lsh=None, k=None, mutual=False, exact_df=False):
+        # token_ids compares `preprocessed_events_graphedge_ids`, e.g., from ParallelPreprocess with token_ids.
+        # exact_df counts the document frequency in every pair instead of caching it within a chunk of pairs, and
+        # only then pairs without a common token are skipped. a partition or lsh always uses exact_df, since the
+        # skipped pairs would otherwise change the cached counts of the next pairs.
         self.event_attributes = event_attributes
         self.event_length = event_length
-        self.cosine_similarity = CosineSimilarity()
+        self.exact_df = exact_df or bool(partition) or bool(lsh)
+        self.cosine_similarity = CosineSimilarity(self.exact_df)
         self.edges_weight = []
         self.nodes = nodes
+        self.token_ids = token_ids
+        self.event_key = 'preprocessed_events_graphedge_ids' if token_ids else 'preprocessed_events_graphedge'
+        self.chunksize = chunksize
+        self.partition = partition
+        self.lsh = lsh
+        self.k = k
+        self.mutual = mutual
+        self.events = None
+
+    def __getstate__(self):
+        # the processes read the events from the shared memory region, so the attributes are not pickled
+        state = self.__dict__.copy()
+        state.update({'event_attributes': None, 'nodes': None, 'partition': None, 'lsh': None, 'edges_weight': []})
+        return state
+
+    def __call__(self, tile):
+        # get distance of every pair in a tile and send back only the edges as packed arrays
+        # the cached document frequency is kept only within a tile, like a chunk of `Pool.map` in earlier versions
+        sources, destinations = tile
+        edge_sources, edge_destinations, edge_weights = array('l'), array('l'), array('d')
+        self.cosine_similarity.word_count = {}
+        for source, destination in izip(sources, destinations):
+            distance = self.cosine_similarity.get_cosine_similarity(self.events[source], self.events[destination])
+            if distance > 0.:
+                edge_sources.append(source)
+                edge_destinations.append(destination)
+                edge_weights.append(round(distance, 3))
+
+        return edge_sources, edge_destinations, edge_weights
+
+    def __get_shared_events(self, nodes):
+        # pack the events of the nodes into a shared memory region indexed by unique event id
+        events = [None] * (max(nodes) + 1 if nodes else 0)
+        for node in nodes:
+            events[node] = self.event_attributes[node][self.event_key]
+
+        return SharedEvents(events, Vocabulary.typecode if self.token_ids else None)
 
-    def __get_cosine_similarity(self, unique_event_id):
-        # calculate cosine similarity
-        string1 = self.event_attributes[unique_event_id[0]]['preprocessed_events_graphedge']
-        string2 = self.event_attributes[unique_event_id[1]]['preprocessed_events_graphedge']
-        distance = self.cosine_similarity.get_cosine_similarity(string1, string2)
-        if distance > 0.:
-            return round(distance, 3)
-
-    def __call__(self, unique_event_id):
-        # get distance from two strings
-        distance = self.__get_cosine_similarity(unique_event_id)
-        distance_with_id = (unique_event_id[0], unique_event_id[1], distance)
-        return distance_with_id
+    @staticmethod
+    def __get_edges(results):
+        # unpack the edges of every tile in order
+        for edge_sources, edge_destinations, edge_weights in results:
+            for edge in izip(edge_sources, edge_destinations, edge_weights):
+                yield edge
+
+    def __get_tokens(self, unique_event_id):
+        # get distinct words or token ids of an event
+        event = self.event_attributes[unique_event_id][self.event_key]
+        tokens = set(event.split() if isinstance(event, basestring) else event)
+        return tokens
+
+    @staticmethod
+    def __get_candidate_pairs(nodes, tokens):
+        """Generate pairs of unique events which share at least one token with an inverted index.
+
+        The numerator of cosine similarity only sums over the common words, so a pair without a common token
+        always has zero similarity and is never an edge. The pairs are in the same order as
+        `combinations(nodes, 2)`.
+
+        Parameters
+        ----------
+        nodes   : list[int]
+            Unique event ids.
+        tokens  : list[set]
+            Distinct tokens of each node in the same order.
+
+        Returns
+        -------
+        pairs   : generator
+            Pairs of unique event ids with at least one common token.
+        """
+        postings = defaultdict(list)    # key: token, value: ascending positions of nodes with the token
+        for position, node_tokens in enumerate(tokens):
+            for token in node_tokens:
+                postings[token].append(position)
+
+        for position, node_tokens in enumerate(tokens):
+            candidates = set()
+            for token in node_tokens:
+                posting = postings[token]
+                candidates.update(posting[bisect_right(posting, position):])
+
+            for candidate in sorted(candidates):
+                yield nodes[position], nodes[candidate]
 
     def get_parallel_cosine_similarity(self):
-        # get unique event id combination
-        if self.nodes:
-            event_id_combination = list(combinations(self.nodes, 2))
+        # get unique event id pairs with at least one common token, only within partitions if a partition is given.
+        # approximate candidate pairs from MinHashLSH are used instead if it is given.
+        nodes = list(self.nodes) if self.nodes else range(self.event_length)
+        tokens = [self.__get_tokens(node) for node in nodes] if self.exact_df else []
+        tile_size = self.chunksize
+        if not self.exact_df:
+            # all pairs in the same chunks as `multiprocessing.Pool.map` in earlier versions, since the cached
+            # document frequency depends on the pairs before a pair in its chunk
+            event_id_combination = combinations(nodes, 2)
+            total_combinations = len(nodes) * (len(nodes) - 1) // 2
+            if not tile_size:
+                tile_size, extra = divmod(total_combinations, multiprocessing.cpu_count() * 4)
+                tile_size = max(1, tile_size + 1 if extra else tile_size)
+        elif self.lsh:
+            event_id_combination = self.lsh.get_candidate_pairs(nodes, tokens)
+            total_combinations = len(nodes) * (len(nodes) - 1) // 2
+        elif self.partition:
+            node_tokens = dict(zip(nodes, tokens))
+            event_id_combination = ((node1, node2) for node1, node2 in self.partition.get_pairs(nodes)
+                                    if not node_tokens[node1].isdisjoint(node_tokens[node2]))
+            total_combinations = self.partition.get_total_pairs(nodes)
         else:
-            event_id_combination = list(combinations(xrange(self.event_length), 2))
-
-        # get distance with multiprocessing
-        total_cpu = multiprocessing.cpu_count()
-        pool = multiprocessing.Pool(processes=total_cpu)
-        distances = pool.map(self, event_id_combination)
-        pool.close()
-        pool.join()
-
-        # remove empty elements
-        removed = []
-        for index, distance in enumerate(distances):
-            if distance[2] is None:
-                removed.append(index)
-
-        distances = [y for x, y in enumerate(distances) if x not in removed]
+            event_id_combination = self.__get_candidate_pairs(nodes, tokens)
+            total_combinations = len(nodes) * (len(nodes) - 1) // 2
+
+            # the number of pairs in all postings is an upper bound of the candidates for the chunk size
+            token_counts = Counter(token for node_tokens in tokens for token in node_tokens)
+            total_candidates = sum(count * (count - 1) // 2 for count in token_counts.itervalues())
+            total_combinations = min(total_combinations, total_candidates)
+
+        # send tiles of pairs to the shared pool. the processes read the events from shared memory and stream back
+        # only the edges, so the memory does not grow with the number of pairs.
+        tile_size = tile_size or min(SharedEvents.tile_size, WorkerPool.get_chunksize(total_combinations))
+        self.events = self.__get_shared_events(nodes)
+        try:
+            tiles = SharedEvents.get_tiles(event_id_combination, tile_size)
+            results = WorkerPool.imap(self, tiles, total_combinations // tile_size + 1, chunksize=1)
+            distances = self.__get_edges(results)
+
+            # keep only the edges to the k nearest neighbours of every node with a bounded heap per node
+            if self.k:
+                knn = KNearestNeighbors(self.k, self.mutual)
+                knn.add_edges(distances)
+                distances = knn.get_edges()
+            else:
+                distances = list(distances)
+        finally:
+            self.events.close()
+            self.events = None
+
         self.edges_weight = distances
         return distances
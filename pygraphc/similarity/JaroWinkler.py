@@ -1,33 +1,59 @@
 import jellyfish
-import multiprocessing
-from itertools import combinations
+from array import array
+from itertools import combinations, izip
+from pygraphc.preprocess.WorkerPool import WorkerPool
+from pygraphc.similarity.SharedEvents import SharedEvents
 
 
 class JaroWinkler(object):
-    def __init__(self, event_attributes, event_length):
+    def __init__(self, event_attributes, event_length, chunksize=None):
         self.event_attributes = event_attributes
         self.event_length = event_length
+        self.chunksize = chunksize
+        self.events = None
 
-    def __jarowinkler(self, unique_event_id):
-        string1 = unicode(self.event_attributes[unique_event_id[0]]['preprocessed_event'], 'utf-8')
-        string2 = unicode(self.event_attributes[unique_event_id[1]]['preprocessed_event'], 'utf-8')
+    def __getstate__(self):
+        # the processes read the events from the shared memory region, so the attributes are not pickled
+        state = self.__dict__.copy()
+        state['event_attributes'] = None
+        return state
+
+    def __jarowinkler(self, source, destination):
+        string1 = unicode(self.events[source], 'utf-8')
+        string2 = unicode(self.events[destination], 'utf-8')
         distance = jellyfish.jaro_winkler(string1, string2)
         if distance > 0.:
             return round(distance, 3)
 
-    def __call__(self, unique_event_id):
-        distance = self.__jarowinkler(unique_event_id)
-        distance_with_id = (unique_event_id[0], unique_event_id[1], distance)
-        return distance_with_id
+    def __call__(self, tile):
+        # get distance of every pair in a tile and send back only the edges as packed arrays
+        sources, destinations = tile
+        edge_sources, edge_destinations, edge_weights = array('l'), array('l'), array('d')
+        for source, destination in izip(sources, destinations):
+            distance = self.__jarowinkler(source, destination)
+            if distance is not None:
+                edge_sources.append(source)
+                edge_destinations.append(destination)
+                edge_weights.append(distance)
+
+        return edge_sources, edge_destinations, edge_weights
 
     def get_jarowinkler(self):
-        # get unique event id combination
-        event_id_combination = list(combinations(xrange(self.event_length), 2))
-
-        # get distance with multiprocessing
-        pool = multiprocessing.Pool(processes=4)
-        distances = pool.map(self, event_id_combination)
-        pool.close()
-        pool.join()
+        # get unique event id combination as tiles
+        total_combinations = self.event_length * (self.event_length - 1) // 2
+        tile_size = self.chunksize or min(SharedEvents.tile_size, WorkerPool.get_chunksize(total_combinations))
+        tiles = SharedEvents.get_tiles(combinations(xrange(self.event_length), 2), tile_size)
+
+        # get distance with the shared pool. the events are read from shared memory and only the edges are sent back.
+        events = [self.event_attributes[index]['preprocessed_event'] for index in xrange(self.event_length)]
+        self.events = SharedEvents(events)
+        try:
+            distances = []
+            for edge_sources, edge_destinations, edge_weights in \
+                    WorkerPool.imap(self, tiles, total_combinations // tile_size + 1, chunksize=1):
+                distances.extend(izip(edge_sources, edge_destinations, edge_weights))
+        finally:
+            self.events.close()
+            self.events = None
 
         return distances
@@ -0,0 +1,81 @@
+from heapq import heappush, heapreplace
+
+
+class KNearestNeighbors(object):
+    """Keep only the edges to the k most similar neighbours of every node.
+
+    Weighted edges are added as a stream, and every node keeps a bounded min-heap of its `k` heaviest edges, so the
+    memory is O(nk) however many edges are added. An edge is kept if it is in the top-k of one of its nodes, or of
+    both nodes for mutual kNN. Therefore, a graph has at most nk edges and a mutual kNN graph has at most nk / 2
+    edges. Among edges with the same weight, the one added first is preferred, and the kept edges are returned in
+    the order they are added.
+    """
+    def __init__(self, k, mutual=False):
+        """The constructor of class KNearestNeighbors.
+
+        Parameters
+        ----------
+        k       : int
+            Number of neighbours of a node.
+        mutual  : bool
+            Keep an edge only if each node is one of the k nearest neighbours of the other.
+        """
+        self.k = k
+        self.mutual = mutual
+        self.heaps = {}     # key: node, value: min-heap of (weight, negative order, edge)
+        self.total_edges = 0
+
+    def __push(self, node, item):
+        # add an edge to the heap of a node and remove the lightest edge if the heap is full
+        heap = self.heaps.setdefault(node, [])
+        if len(heap) < self.k:
+            heappush(heap, item)
+        elif item > heap[0]:
+            heapreplace(heap, item)
+
+    def add(self, source, destination, weight):
+        """Add a weighted edge.
+
+        Parameters
+        ----------
+        source      : int
+            A node identifier.
+        destination : int
+            Another node identifier.
+        weight      : float
+            Similarity of the nodes. A larger weight is nearer.
+        """
+        item = (weight, -self.total_edges, (source, destination, weight))
+        self.__push(source, item)
+        self.__push(destination, item)
+        self.total_edges += 1
+
+    def add_edges(self, edges):
+        """Add weighted edges.
+
+        Parameters
+        ----------
+        edges   : iterable
+            Edges as (source, destination, weight).
+        """
+        for source, destination, weight in edges:
+            self.add(source, destination, weight)
+
+    def get_edges(self):
+        """Get the kept edges.
+
+        Returns
+        -------
+        edges   : list[tuple]
+            Edges as (source, destination, weight) in the order they are added.
+        """
+        counts = {}     # key: negative order, value: number of nodes which keep the edge
+        edges = {}
+        for heap in self.heaps.itervalues():
+            for weight, order, edge in heap:
+                counts[order] = counts.get(order, 0) + 1
+                edges[order] = edge
+
+        required = 2 if self.mutual else 1
+        kept_edges = [edges[order] for order in sorted(edges, reverse=True) if counts[order] >= required]
+        return kept_edges
@@ -9,7 +9,7 @@ class LogTextSimilarity(object):
     """A class for calculating cosine similarity between a log pair. This class is intended for
        non-graph based clustering method.
     """
-    def __init__(self, mode, logtype, logs, clusters, cosine_file=''):
+    def __init__(self, mode, logtype, logs, clusters, cosine_file='', token_ids=False):
         """The constructor of class LogTextSimilarity.
 
         Parameters
@@ -22,6 +22,8 @@ class LogTextSimilarity(object):
             List of every line of original logs.
         clusters    : dict
             Dictionary of clusters. Key: cluster_id, value: list of log line id.
+        token_ids   : bool
+            Compare the tf-idf of log lines as token id arrays, see `StringSimilarity.get_cosine_similarity_ids`.
         """
         self.mode = mode
         self.logtype = logtype
@@ -29,6 +31,7 @@ class LogTextSimilarity(object):
         self.clusters = clusters
         self.events = {}
         self.cosine_file = cosine_file
+        self.token_ids = token_ids
 
     def __call__(self, node):
         return self.__write_cosine_csv(node)
@@ -41,10 +44,7 @@ class LogTextSimilarity(object):
             row = []
             for c in cluster:
                 if node != c:
-                    similarity = StringSimilarity.get_cosine_similarity(self.events[node]['tf-idf'],
-                                                                        self.events[c]['tf-idf'],
-                                                                        self.events[node]['length'],
-                                                                        self.events[c]['length'])
+                    similarity = StringSimilarity.get_event_similarity(self.events[node], self.events[c])
                     if similarity > 0:
                         row.append(1 - similarity)
             if row:
@@ -61,7 +61,7 @@ class LogTextSimilarity(object):
             Dictionary of cosine similarity in non-graph clustering. Key: (log_id1, log_id2),
             value: cosine similarity distance.
         """
-        preprocess = PreprocessLog(self.logtype)
+        preprocess = PreprocessLog(self.logtype, token_ids=self.token_ids)
         preprocess.preprocess_text(self.logs)
         self.events = preprocess.events_text
         cosines_similarity = {}
@@ -70,10 +70,7 @@ class LogTextSimilarity(object):
             # calculate cosine similarity
             for log_pair in combinations(range(preprocess.loglength), 2):
                 cosines_similarity[log_pair] = \
-                    StringSimilarity.get_cosine_similarity(self.events[log_pair[0]]['tf-idf'],
-                                                           self.events[log_pair[1]]['tf-idf'],
-                                                           self.events[log_pair[0]]['length'],
-                                                           self.events[log_pair[1]]['length'])
+                    StringSimilarity.get_event_similarity(self.events[log_pair[0]], self.events[log_pair[1]])
             return cosines_similarity
 
         elif self.mode == 'text-csv':
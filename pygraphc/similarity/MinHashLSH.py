@@ -0,0 +1,162 @@
+from bisect import bisect_right
+from collections import defaultdict
+from random import Random
+from zlib import crc32
+import numpy as np
+from pygraphc.similarity.CosineSimilarity import ParallelCosineSimilarity
+
+
+class MinHashLSH(object):
+    """Approximate candidate pairs of unique events with MinHash signatures and banded locality-sensitive hashing.
+
+    The signature of an event is the minimum of `bands * rows` hash functions over its distinct tokens, so two
+    events agree on a hash value with probability equal to the Jaccard similarity of their tokens. The signature
+    is split into `bands` bands of `rows` values, and two events are a candidate pair if all values of at least
+    one band are equal. A pair with Jaccard similarity `s` is a candidate with probability
+    `1 - (1 - s ** rows) ** bands`, so more rows find fewer and more similar candidates and more bands find more
+    candidates. The exact cosine similarity is only calculated for the candidates by `ParallelCosineSimilarity`,
+    so an edge is either exact or missing. Use `estimate_recall` to check the missing edges on a sample.
+    """
+    def __init__(self, bands=16, rows=4, seed=0):
+        """The constructor of class MinHashLSH.
+
+        Parameters
+        ----------
+        bands   : int
+            Number of bands.
+        rows    : int
+            Number of hash values in a band.
+        seed    : int
+            Seed of the hash functions.
+        """
+        self.bands = bands
+        self.rows = rows
+        self.seed = seed
+
+        # multiply-shift hash functions with odd 64-bit multipliers
+        random = Random(seed)
+        total_hashes = bands * rows
+        self.multipliers = np.array([random.getrandbits(64) | 1 for _ in xrange(total_hashes)], dtype=np.uint64)
+        self.increments = np.array([random.getrandbits(64) for _ in xrange(total_hashes)], dtype=np.uint64)
+
+    def get_probability(self, similarity):
+        """Get the probability that a pair with a Jaccard similarity is a candidate.
+
+        Parameters
+        ----------
+        similarity  : float
+            Jaccard similarity of the tokens of two events.
+
+        Returns
+        -------
+        probability : float
+            Probability of the pair to be a candidate.
+        """
+        return 1 - (1 - similarity ** self.rows) ** self.bands
+
+    def get_signature(self, tokens):
+        """Get the MinHash signature of the distinct tokens of an event.
+
+        Parameters
+        ----------
+        tokens      : set
+            Distinct words or token ids of an event.
+
+        Returns
+        -------
+        signature   : numpy.ndarray
+            Minimum hash value of every hash function, or None if there is no token.
+        """
+        if not tokens:
+            return None
+
+        # crc32 gives the same token hashes in every process, unlike the randomized hash of strings
+        hashes = np.array([crc32(token.encode('utf-8') if isinstance(token, unicode) else str(token)) & 0xffffffff
+                           for token in tokens], dtype=np.uint64)
+        values = (self.multipliers[:, np.newaxis] * hashes[np.newaxis, :] + self.increments[:, np.newaxis]) >> \
+            np.uint64(32)
+        signature = values.min(axis=1)
+        return signature
+
+    def get_candidate_pairs(self, nodes, tokens):
+        """Generate candidate pairs of unique events from the bands of their signatures.
+
+        Parameters
+        ----------
+        nodes   : list[int]
+            Unique event ids.
+        tokens  : list[set]
+            Distinct tokens of each node in the same order.
+
+        Returns
+        -------
+        pairs   : generator
+            Candidate pairs of unique event ids in the same order as `combinations(nodes, 2)`.
+        """
+        buckets = defaultdict(list)     # key: band index and band values, value: ascending positions of nodes
+        node_buckets = []               # bucket keys of every node
+        for position, node_tokens in enumerate(tokens):
+            signature = self.get_signature(node_tokens)
+            keys = []
+            if signature is not None:
+                for band in xrange(self.bands):
+                    key = (band, signature[band * self.rows:(band + 1) * self.rows].tostring())
+                    buckets[key].append(position)
+                    keys.append(key)
+            node_buckets.append(keys)
+
+        return self.__get_pairs(nodes, buckets, node_buckets)
+
+    @staticmethod
+    def __get_pairs(nodes, buckets, node_buckets):
+        # stream the pairs of every node with the larger nodes in its buckets, so only the candidates of one node
+        # are in memory at once instead of all pairs of a large bucket
+        for position, keys in enumerate(node_buckets):
+            candidates = set()
+            for key in keys:
+                bucket = buckets[key]
+                candidates.update(bucket[bisect_right(bucket, position):])
+
+            for candidate in sorted(candidates):
+                yield nodes[position], nodes[candidate]
+
+    def estimate_recall(self, event_attributes, event_length, sample_size=1000, seed=0, token_ids=False):
+        """Estimate the fraction of exact edges found by the approximate builder on a random sample of events.
+
+        Whether a pair is a candidate only depends on the two events, so the recall on the pairs of a random sample
+        is an unbiased estimate of the recall on all pairs, while the exact builder only runs on the sample.
+
+        Parameters
+        ----------
+        event_attributes    : dict
+            Attributes of unique events, e.g., `ParallelPreprocess.event_attributes`.
+        event_length        : int
+            Number of unique events.
+        sample_size         : int
+            Number of sampled unique events.
+        seed                : int
+            Seed of the sample.
+        token_ids           : bool
+            Compare token ids instead of words like `ParallelCosineSimilarity`. The events need
+            `preprocessed_events_graphedge_ids`, e.g., from `ParallelPreprocess` with token_ids.
+
+        Returns
+        -------
+        recall              : float
+            Number of approximate edges divided by the number of exact edges in the sample, 1.0 if there is no
+            exact edge.
+        """
+        nodes = range(event_length)
+        if event_length > sample_size:
+            nodes = sorted(Random(seed).sample(nodes, sample_size))
+
+        exact = ParallelCosineSimilarity(event_attributes, event_length, nodes, token_ids, exact_df=True)
+        exact_edges = set(exact.get_parallel_cosine_similarity())
+        approximate = ParallelCosineSimilarity(event_attributes, event_length, nodes, token_ids, lsh=self)
+        approximate_edges = set(approximate.get_parallel_cosine_similarity())
+
+        if not exact_edges:
+            return 1.
+
+        recall = len(exact_edges & approximate_edges) / float(len(exact_edges))
+        return recall
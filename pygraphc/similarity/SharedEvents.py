@@ -0,0 +1,143 @@
+import mmap
+import os
+import tempfile
+from array import array
+
+
+class SharedEvents(object):
+    """Events packed into a file-backed shared memory region for the processes of `WorkerPool`.
+
+    The events, i.e., strings or token id arrays indexed by unique event id, are written once to a file in
+    `/dev/shm` if it exists, and every process maps the same file instead of receiving a pickled copy of the
+    attribute dictionary with every chunk of tasks. Only the path is pickled, and the region is mapped lazily on
+    the first access in a process. The owner removes the file with `close`.
+
+    The file starts with the offsets of all events as an `array('L')` and continues with the packed events. An
+    event is a string, or an array with `typecode` if it is given.
+    """
+    shm_dir = '/dev/shm'
+    tile_size = 16384
+    mapped = {}     # key: path, value: memory map in the current process
+
+    def __init__(self, events, typecode=None):
+        """The constructor of class SharedEvents.
+
+        Parameters
+        ----------
+        events      : list
+            Events indexed by unique event id. A missing event is None.
+        typecode    : str
+            Typecode of token id arrays, or None for strings.
+        """
+        self.typecode = typecode
+        self.length = len(events)
+        self.owner = os.getpid()
+
+        offsets = array('L', [0])
+        directory = self.shm_dir if os.path.isdir(self.shm_dir) else None
+        descriptor, self.path = tempfile.mkstemp(prefix='pygraphc-', suffix='.events', dir=directory)
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write('\0' * (offsets.itemsize * (self.length + 1)))
+            for event in events:
+                if event is None:
+                    data = ''
+                elif typecode:
+                    data = array(typecode, event).tostring()
+                else:
+                    data = event.encode('utf-8') if isinstance(event, unicode) else event
+                f.write(data)
+                offsets.append(offsets[-1] + len(data))
+
+            f.seek(0)
+            f.write(offsets.tostring())
+
+        self.header_size = offsets.itemsize * (self.length + 1)
+        self.offsets = None
+
+    def __getstate__(self):
+        # only the path is sent to another process
+        return {'path': self.path, 'typecode': self.typecode, 'length': self.length, 'owner': self.owner,
+                'header_size': self.header_size}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.offsets = None
+
+    def __len__(self):
+        return self.length
+
+    def __get_map(self):
+        # map the file once per process and keep only the latest map
+        region = self.mapped.get(self.path)
+        if region is None:
+            for path in self.mapped.keys():
+                self.mapped.pop(path).close()
+            with open(self.path, 'rb') as f:
+                region = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mapped[self.path] = region
+
+        return region
+
+    def __getitem__(self, unique_event_id):
+        """Get an event.
+
+        Parameters
+        ----------
+        unique_event_id : int
+            Unique event identifier.
+
+        Returns
+        -------
+        event           : str or array.array
+            The event as a string or a token id array.
+        """
+        region = self.__get_map()
+        if self.offsets is None:
+            self.offsets = array('L')
+            self.offsets.fromstring(region[:self.header_size])
+
+        data = region[self.header_size + self.offsets[unique_event_id]:
+                      self.header_size + self.offsets[unique_event_id + 1]]
+        if self.typecode:
+            event = array(self.typecode)
+            event.fromstring(data)
+            return event
+
+        return data
+
+    def close(self):
+        """Remove the shared file if it is created by the current process.
+        """
+        region = self.mapped.pop(self.path, None)
+        if region is not None:
+            region.close()
+        if self.owner == os.getpid() and os.path.exists(self.path):
+            os.remove(self.path)
+
+    @classmethod
+    def get_tiles(cls, pairs, tile_size=None):
+        """Pack a stream of pairs into tiles of two arrays.
+
+        Parameters
+        ----------
+        pairs       : iterable
+            Pairs of unique event ids.
+        tile_size   : int
+            Number of pairs in a tile. The default is `tile_size`.
+
+        Returns
+        -------
+        tiles       : generator
+            Tiles as (source ids, destination ids), both `array('l')`.
+        """
+        tile_size = tile_size or cls.tile_size
+        sources, destinations = array('l'), array('l')
+        for source, destination in pairs:
+            sources.append(source)
+            destinations.append(destination)
+            if len(sources) >= tile_size:
+                yield sources, destinations
+                sources, destinations = array('l'), array('l')
+
+        if sources:
+            yield sources, destinations
@@ -38,3 +38,72 @@ class StringSimilarity(object):
 
         cosine_similarity = round(cosine_similarity, 3)
         return cosine_similarity
+
+    @staticmethod
+    def get_cosine_similarity_ids(tfidf_ids1, tfidf_weights1, tfidf_ids2, tfidf_weights2, length1, length2):
+        """Measure cosine similarity between two messages given as token ids and tf-idf weights.
+
+        This is the same measure as `get_cosine_similarity`, but the tf-idf of each message is given as two
+        parallel arrays, e.g., `tfidf_ids` and `tfidf_weights` from `PreprocessLog` with token_ids. The words are
+        compared as integers with a single dictionary lookup per token instead of comparing every pair of words.
+
+        Parameters
+        ----------
+        tfidf_ids1      : array.array
+            Token ids from the first message.
+        tfidf_weights1  : array.array
+            tf-idf value of each token id from the first message.
+        tfidf_ids2      : array.array
+            Token ids from the second message.
+        tfidf_weights2  : array.array
+            tf-idf value of each token id from the second message.
+        length1         : float
+            Denominator in cosine similarity from the first message.
+        length2         : float
+            Denominator in cosine similarity from the second message.
+
+        Returns
+        -------
+        cosine_similarity   : float
+            Cosine similarity between two messages.
+        """
+        weights2 = dict(zip(tfidf_ids2, tfidf_weights2))
+        vector_products = 0
+        for token_id, weight1 in zip(tfidf_ids1, tfidf_weights1):
+            if token_id in weights2:
+                vector_products += weight1 * weights2[token_id]
+
+        try:
+            cosine_similarity = vector_products / (length1 * length2)
+        except ZeroDivisionError:
+            cosine_similarity = 0
+
+        cosine_similarity = round(cosine_similarity, 3)
+        return cosine_similarity
+
+    @staticmethod
+    def get_event_similarity(event1, event2):
+        """Measure cosine similarity between two preprocessed events.
+
+        The token id arrays are compared with `get_cosine_similarity_ids` if the events have them, e.g., from
+        `PreprocessLog` with token_ids. Otherwise, the tf-idf lists are compared with `get_cosine_similarity`.
+
+        Parameters
+        ----------
+        event1  : dict
+            Attributes of the first event with `tf-idf` and `length`.
+        event2  : dict
+            Attributes of the second event with `tf-idf` and `length`.
+
+        Returns
+        -------
+        cosine_similarity   : float
+            Cosine similarity between two events.
+        """
+        if 'tfidf_ids' in event1 and 'tfidf_ids' in event2:
+            return StringSimilarity.get_cosine_similarity_ids(event1['tfidf_ids'], event1['tfidf_weights'],
+                                                              event2['tfidf_ids'], event2['tfidf_weights'],
+                                                              event1['length'], event2['length'])
+
+        return StringSimilarity.get_cosine_similarity(event1['tf-idf'], event2['tf-idf'], event1['length'],
+                                                      event2['length'])
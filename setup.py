@@ -32,8 +32,7 @@ setup(name='pygraphc',
           'pyparsing',
           'jellyfish',
           'orderedset',
-          'community',
-          'datefinder'
+          'community'
       ],
       include_package_data=True,
       zip_safe=False)